@@ -7,39 +7,101 @@ It reads the issue details, analyzes the requirements, and makes appropriate cha
 """
 
 import os
+import re
 import sys
+import atexit
+import io
 import json
-import subprocess
+import functools
+import hashlib
+import string
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Any, Optional
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Union
 
-# Try to import AI libraries
+# orjson decodes large file-map responses faster; stdlib json is the fallback
 try:
-    import openai
-    OPENAI_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    OPENAI_AVAILABLE = False
+    ORJSON_AVAILABLE = False
 
-try:
-    import anthropic
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    ANTHROPIC_AVAILABLE = False
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _json_loads(content: str) -> Any:
+    """Decode JSON with orjson when installed (its errors subclass json.JSONDecodeError)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _json_dumps_indented(data: Any) -> str:
+    """Encode JSON with a two-space indent, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(data, indent=2)
+
+
+@dataclass
+class Provider:
+    """
+    An AI provider resolved once at startup.
+    
+    ``send(model, context_prompt, task_prompt, temperature, max_tokens, schema)``
+    is bound to the provider's client and returns the raw response text, or
+    the already decoded reply when the provider returns structured data.
+    """
+    name: str  # "openai" or "anthropic"
+    label: str
+    client: Any
+    models: List[str]  # Candidate models in order of preference
+    send: Callable[..., Union[str, Dict[str, Any]]]
 
 
-def get_ai_client():
-    """Initialize and return an AI client based on available API keys."""
+def get_ai_client() -> Optional[Provider]:
+    """
+    Initialize the AI provider based on available API keys.
+    
+    Only the SDK for the selected provider is imported, and the model
+    settings are read from the environment once here. Returns None if no
+    client is available.
+    """
     if os.getenv("OPENAI_API_KEY"):
-        if not OPENAI_AVAILABLE:
+        try:
+            import openai
+        except ImportError:
             print("Warning: OpenAI API key found but openai package not installed")
             return None
-        return openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return Provider(
+            name="openai",
+            label="OpenAI",
+            client=client,
+            models=_candidate_models(get_openai_model(), OPENAI_MODELS),
+            send=functools.partial(_send_openai, client),
+        )
     
     if os.getenv("ANTHROPIC_API_KEY"):
-        if not ANTHROPIC_AVAILABLE:
+        try:
+            import anthropic
+        except ImportError:
             print("Warning: Anthropic API key found but anthropic package not installed")
             return None
-        return anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        return Provider(
+            name="anthropic",
+            label="Anthropic",
+            client=client,
+            models=_candidate_models(get_anthropic_model(), ANTHROPIC_MODELS),
+            send=functools.partial(_send_anthropic, client),
+        )
     
     print("Warning: No AI API keys found. Set OPENAI_API_KEY or ANTHROPIC_API_KEY")
     return None
@@ -66,12 +128,164 @@ def get_anthropic_model():
     return "claude-3-5-sonnet-20241022"
 
 
-def parse_json_response(content: str) -> Dict[str, Any]:
+# Models to try in order of preference
+OPENAI_MODELS = ["gpt-5-mini", "gpt-4-turbo", "gpt-4", "gpt-3.5-turbo"]
+ANTHROPIC_MODELS = ["claude-3-5-sonnet-20241022", "claude-3-opus-20240229", "claude-3-sonnet-20240229"]
+
+
+def _candidate_models(user_model: str, defaults: List[str]) -> List[str]:
+    """If user specified a model, try it first, then fallback."""
+    return [user_model] + defaults if user_model not in defaults else list(defaults)
+
+
+# Shared system prompt. It opens the cached prompt prefix, so it must be
+# byte-identical between the analyze and implement calls; each task prompt
+# states its own response format.
+SYSTEM_PROMPT = "You are an expert software developer working on the PolarVortex project, a polargraph plotter control system."
+
+# Opt into Anthropic prompt caching for the shared context block
+ANTHROPIC_PROMPT_CACHE_HEADERS = {"anthropic-beta": "prompt-caching-2024-07-31"}
+
+# Routes requests sharing the context prefix to the same OpenAI prompt cache
+OPENAI_PROMPT_CACHE_KEY = "polarvortex-issue-v1"
+
+# Static prompt text, built once; only the dynamic fields are substituted per call
+CONTEXT_TEMPLATE = string.Template(SYSTEM_PROMPT + """
+
+## Project Context
+$repo_context
+
+## Issue to Address
+**Title:** $issue_title
+
+**Description:**
+$issue_body
+""")
+
+COMBINED_TASK_PROMPT = """## Your Task
+Analyze this issue and provide:
+1. A clear understanding of what needs to be done
+2. A list of files that likely need to be modified or created
+3. A step-by-step plan for implementation
+4. Any potential challenges or considerations
+5. If every file in the list is a NEW file that does not exist yet, the complete content of each new file.
+   If any existing file must change, leave "files" empty; those contents will be requested separately.
+
+Respond in JSON format:
+{
+  "analysis": {
+    "understanding": "Brief summary of what needs to be done",
+    "files_to_modify": ["path/to/file1.py", "path/to/file2.jsx"],
+    "implementation_plan": ["Step 1", "Step 2", "Step 3"],
+    "challenges": ["Challenge 1", "Challenge 2"]
+  },
+  "files": [
+    {"path": "path/to/new_file.py", "content": "complete file content here"}
+  ],
+  "summary": "Brief summary of changes made",
+  "notes": "Any important notes about the implementation",
+  "can_implement": true/false
+}
+"""
+
+@dataclass(frozen=True)
+class ResponseSchema:
+    """A JSON schema the model's reply must conform to."""
+    name: str
+    description: str
+    schema: Dict[str, Any]
+
+
+def _strict_object(properties: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON schema object with every property required, as OpenAI strict mode demands."""
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+
+_ANALYSIS_PROPERTIES = {
+    "understanding": {"type": "string"},
+    "files_to_modify": _STRING_LIST,
+    "implementation_plan": _STRING_LIST,
+    "challenges": _STRING_LIST,
+}
+
+# Enforced by the provider while sampling (OpenAI structured outputs,
+# Anthropic forced tool use), so replies never need repairing
+COMBINED_SCHEMA = ResponseSchema(
+    name="issue_analysis_and_new_files",
+    description="Report the analysis of the issue and the content of any new files.",
+    schema=_strict_object({
+        "analysis": _strict_object(_ANALYSIS_PROPERTIES),
+        "files": {
+            "type": "array",
+            "items": _strict_object({"path": {"type": "string"}, "content": {"type": "string"}}),
+        },
+        "summary": {"type": "string"},
+        "notes": {"type": "string"},
+        "can_implement": {"type": "boolean"},
+    }),
+)
+
+IMPLEMENT_TASK_TEMPLATE = string.Template("""## Analysis
+$analysis
+
+## Current Files
+$files
+
+## Your Task
+Implement the changes needed to address this issue. For each file that needs modification, provide the complete updated file content.
+Provide complete file contents, not diffs. Do not escape the content.
+Files shown as <FILE_DOES_NOT_EXIST_YET> do not exist yet; create them.
+
+Respond in exactly this format, using the same delimiters as the current files:
+===== FILE: path/to/file1.py =====
+complete file content here
+===== END FILE: path/to/file1.py =====
+
+===== FILE: path/to/file2.jsx =====
+complete file content here
+===== END FILE: path/to/file2.jsx =====
+
+===== SUMMARY =====
+Brief summary of changes made
+===== NOTES =====
+Any important notes about the implementation
+""")
+
+
+def build_context_prompt(issue_title: str, issue_body: str, repo_context: str) -> str:
+    """
+    Build the stable prompt prefix shared by the analyze and implement calls.
+    
+    Keeping the repository context and issue details in an identical leading
+    block lets the provider serve the second call from its prompt cache
+    (Anthropic ``cache_control``, OpenAI automatic prefix caching).
+    """
+    return CONTEXT_TEMPLATE.substitute(
+        repo_context=repo_context, issue_title=issue_title, issue_body=issue_body
+    )
+
+
+def anthropic_cached_system(context_prompt: str) -> list:
+    """Wrap the shared context as an Anthropic system block marked for caching."""
+    return [{"type": "text", "text": context_prompt, "cache_control": {"type": "ephemeral"}}]
+
+
+def parse_json_response(content: str, json_mode: bool = False) -> Dict[str, Any]:
     """
     Parse JSON from AI response, handling markdown code blocks and malformed JSON.
     
     Args:
         content: Raw content from AI response
+        json_mode: True if the response was requested in JSON mode, in which
+            case the content is decoded directly and the cleanup below only
+            runs if that fails
         
     Returns:
         Parsed JSON dictionary
@@ -82,53 +296,32 @@ def parse_json_response(content: str) -> Dict[str, Any]:
     if not content:
         raise json.JSONDecodeError("Empty content", content, 0)
     
+    if json_mode:
+        try:
+            return _json_loads(content)
+        except json.JSONDecodeError:
+            pass
+    
     # Remove markdown code blocks if present
     content = content.strip()
     
-    # Try to extract JSON from markdown code blocks
-    if content.startswith("```"):
-        # Find the first ``` and extract content between ``` and ```
-        lines = content.split("\n")
-        json_lines = []
-        in_code_block = False
-        for line in lines:
-            stripped = line.strip()
-            if stripped.startswith("```"):
-                if not in_code_block:
-                    # Starting code block, skip language identifier
-                    in_code_block = True
-                    continue
-                else:
-                    # Ending code block
-                    break
-            if in_code_block:
-                json_lines.append(line)
-        if json_lines:
-            content = "\n".join(json_lines).strip()
-        else:
-            # Try to extract JSON after the first ```
-            parts = content.split("```", 2)
-            if len(parts) >= 2:
-                potential_json = parts[1].strip()
-                # Remove language identifier if present (e.g., json)
-                if potential_json.startswith("json"):
-                    potential_json = potential_json[4:].strip()
-                # Remove trailing ``` if present
-                if potential_json.endswith("```"):
-                    potential_json = potential_json[:-3].strip()
-                content = potential_json
-    
-    # Try to find JSON object boundaries if content is malformed
-    # Look for first { and last }
-    first_brace = content.find("{")
-    last_brace = content.rfind("}")
-    
-    if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
-        content = content[first_brace:last_brace + 1]
-    
-    # Try parsing
+    # Extract JSON from a markdown code block, skipping the language identifier
+    # line. Bare JSON (the usual JSON mode case) needs no fence handling.
+    if not content.startswith("{"):
+        fence_start = content.find("```")
+        if fence_start != -1:
+            body_start = content.find("\n", fence_start)
+            if body_start != -1:
+                fence_end = content.find("```", body_start)
+                content = content[body_start + 1:fence_end if fence_end != -1 else len(content)].strip()
+    
+    # Decode forward from the first { and ignore anything after the object.
+    # Unlike trimming to the last }, this copes with trailing prose and with
+    # braces inside string values.
+    start = max(content.find("{"), 0)
     try:
-        return json.loads(content)
+        result, _ = _JSON_DECODER.raw_decode(content, start)
+        return result
     except json.JSONDecodeError as e:
         # Log the problematic content for debugging
         print(f"JSON parsing error at position {e.pos}: {e.msg}")
@@ -143,387 +336,732 @@ def parse_json_response(content: str) -> Dict[str, Any]:
         raise
 
 
+@functools.lru_cache(maxsize=64)
+def _read_capped(path: str, mtime_ns: int, max_bytes: int) -> str:
+    """
+    Read at most ``max_bytes`` of a UTF-8 text file.
+    
+    Only the capped prefix is copied from the kernel, however large the file.
+    ``mtime_ns`` is only part of the cache key so that edited files are
+    re-read while unchanged files are served from memory.
+    """
+    with open(path, "rb") as f:
+        head = f.read(max_bytes)
+    # The cap may split a multi-byte character at the end
+    return head.decode("utf-8", "ignore" if len(head) == max_bytes else "replace")
+
+
+def _read_context_file(path: Path, max_bytes: int) -> Optional[str]:
+    """Read a context file through the mtime-keyed cache, or None if missing."""
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except OSError:
+        return None
+    return _read_capped(str(path), mtime_ns, max_bytes)
+
+
+SKIP_DIRS = {".git", "node_modules", "__pycache__", ".venv", "dist", "build"}
+
+
+def _gitignored_dirs(root: str) -> Set[str]:
+    """
+    Return plain directory names listed in the root .gitignore.
+    
+    Only simple entries such as ``venv/`` or ``/dist`` are used; patterns with
+    wildcards, negations or nested paths are ignored.
+    """
+    names = set()
+    try:
+        with open(os.path.join(root, ".gitignore"), "r", encoding="utf-8") as f:
+            for line in f:
+                entry = line.strip().strip("/")
+                if entry and not entry.startswith("#") and not any(c in entry for c in "*?[!/"):
+                    names.add(entry)
+    except OSError:
+        pass
+    return names
+
+
+def _iter_source_files(root: str, exts=(".py", ".jsx", ".tsx"), limit: int = 50):
+    """
+    Yield up to ``limit`` source file paths under ``root``.
+    
+    Walks directories breadth-first with ``os.scandir`` and stops as soon as
+    the limit is reached, so large trees are never fully traversed. Heavy
+    directories and directories ignored by the root .gitignore are pruned.
+    ``DirEntry`` type checks reuse the directory listing and need no stat.
+    """
+    skip_dirs = SKIP_DIRS | _gitignored_dirs(root)
+    found = 0
+    pending = deque([root])
+    while pending:
+        directory = pending.popleft()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in skip_dirs:
+                            pending.append(entry.path)
+                    elif entry.name.endswith(exts) and entry.is_file(follow_symlinks=False):
+                        yield entry.path
+                        found += 1
+                        if found >= limit:
+                            return
+        except OSError:
+            continue
+
+
+@functools.lru_cache(maxsize=1)
 def get_repo_context() -> str:
-    """Get repository context by reading key files."""
-    context_parts = []
+    """
+    Get repository context by reading key files.
+    
+    Memoized per process; call ``get_repo_context.cache_clear()`` after
+    changing the working tree to gather it afresh.
+    """
+    buf = io.StringIO()
     
     # Read project structure
     repo_root = Path(".")
     
-    # Read AGENTS.md for project guidelines
-    if (repo_root / "AGENTS.md").exists():
-        with open(repo_root / "AGENTS.md", "r", encoding="utf-8") as f:
-            context_parts.append(f"## Project Guidelines\n{f.read()}\n")
+    # AGENTS.md for project guidelines and README files, limited in size to
+    # avoid rate limits and oversized prompts
+    context_files = [
+        ("AGENTS.md", 16384),
+        ("README.md", 2048),
+        ("backend/README.md", 2048),
+        ("frontend/README.md", 2048),
+    ]
+    with ThreadPoolExecutor(max_workers=len(context_files)) as executor:
+        futures = [
+            executor.submit(_read_context_file, repo_root / name, max_bytes)
+            for name, max_bytes in context_files
+        ]
+        contents = []
+        for future in futures:
+            try:
+                contents.append(future.result(timeout=10))
+            except Exception as e:
+                print(f"Warning: Could not read context file: {e}")
+                contents.append(None)
     
-    # Read README files (limit size to avoid rate limits)
-    for readme in ["README.md", "backend/README.md", "frontend/README.md"]:
-        if (repo_root / readme).exists():
-            with open(repo_root / readme, "r", encoding="utf-8") as f:
-                content = f.read()[:1500]  # Limit to 1500 chars per README
-                context_parts.append(f"## {readme}\n{content}\n")
+    # Sections are written straight into one buffer, separated by blank lines
+    for (name, _), content in zip(context_files, contents):
+        if content is None:
+            continue
+        if buf.tell():
+            buf.write("\n")
+        heading = "Project Guidelines" if name == "AGENTS.md" else name
+        buf.write(f"## {heading}\n{content}\n")
     
     # Get file structure
-    try:
-        result = subprocess.run(
-            ["find", ".", "-type", "f", "-name", "*.py", "-o", "-name", "*.jsx", "-o", "-name", "*.tsx"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if result.returncode == 0:
-            files = result.stdout.strip().split("\n")[:50]  # Limit to 50 files
-            context_parts.append(f"## Key Files\n{chr(10).join(files)}\n")
-    except:
-        pass
+    files = list(_iter_source_files("."))  # Limited to 50 files
+    if files:
+        if buf.tell():
+            buf.write("\n")
+        buf.write("## Key Files\n")
+        buf.write("\n".join(files))
+        buf.write("\n")
     
-    return "\n".join(context_parts)
+    return buf.getvalue()
+
+
+def clear_repo_context_cache() -> None:
+    """Forget the memoized repository context after the working tree changed."""
+    get_repo_context.cache_clear()
+
+
+# Shared across calls within one run so unavailable models are only probed once
+_model_blacklist: Set[str] = set()
+_preferred_model: Dict[str, str] = {}
+_probed_kinds: Set[str] = set()
+_warmup_threads: Dict[str, threading.Thread] = {}
+
+
+def _is_model_not_found(error_str: str) -> bool:
+    return "model_not_found" in error_str or "does not exist" in error_str
+
 
+def _is_rate_limit(error_str: str) -> bool:
+    return "rate_limit" in error_str.lower() or "429" in error_str or "tokens per min" in error_str.lower()
 
-def analyze_issue_with_ai(client: Any, issue_title: str, issue_body: str, repo_context: str) -> Dict[str, Any]:
-    """Use AI to analyze the issue and generate a plan."""
+
+def _models_to_try(provider: Provider) -> List[str]:
+    """Order candidate models: last successful, user-specified, then defaults; skip known-missing."""
+    candidates = provider.models
+    preferred = _preferred_model.get(provider.name)
+    if preferred:
+        candidates = [preferred] + [m for m in candidates if m != preferred]
+    return [m for m in candidates if m not in _model_blacklist]
+
+
+def _probe_models(provider: Provider, models: List[str]) -> None:
+    """
+    Check which candidate models exist, all at once, and blacklist missing ones.
     
-    prompt = f"""You are an expert software developer working on the PolarVortex project, a polargraph plotter control system.
+    Uses the cheap model metadata endpoint, so an unavailable default costs
+    one overlapped round trip instead of a full prompt upload per model.
+    Any other probe failure is ignored and left to the real request.
+    """
+    models_api = getattr(provider.client, "models", None)
+    if models_api is None or not hasattr(models_api, "retrieve") or len(models) < 2:
+        return
+    
+    with ThreadPoolExecutor(max_workers=min(len(models), 4)) as executor:
+        futures = {executor.submit(models_api.retrieve, model): model for model in models}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                if getattr(e, "status_code", None) == 404 or _is_model_not_found(str(e)):
+                    print(f"Model {futures[future]} not available, skipping")
+                    _model_blacklist.add(futures[future])
 
-## Project Context
-{repo_context}
 
-## Issue to Address
-**Title:** {issue_title}
+def start_warmup(provider: Provider) -> None:
+    """
+    Probe model availability in a background thread.
+    
+    Started before the repository context is gathered so the TLS handshake
+    and model probes overlap the filesystem work instead of delaying the
+    first real request.
+    """
+    if provider.name in _probed_kinds:
+        return
+    _probed_kinds.add(provider.name)
+    thread = threading.Thread(
+        target=_probe_models, args=(provider, _models_to_try(provider)), daemon=True
+    )
+    thread.start()
+    _warmup_threads[provider.name] = thread
 
-**Description:**
-{issue_body}
 
-## Your Task
-Analyze this issue and provide:
-1. A clear understanding of what needs to be done
-2. A list of files that likely need to be modified
-3. A step-by-step plan for implementation
-4. Any potential challenges or considerations
+# Streaming timeouts: connecting may take a while on a cold runner, but once
+# the request is sent the first token (and each one after) must arrive within
+# FIRST_TOKEN_TIMEOUT or the request is abandoned
+INIT_TIMEOUT = 30.0
+FIRST_TOKEN_TIMEOUT = 120.0
+PROGRESS_INTERVAL = 4000  # Log progress every ~4000 streamed characters
 
-Respond in JSON format:
-{{
-  "understanding": "Brief summary of what needs to be done",
-  "files_to_modify": ["path/to/file1.py", "path/to/file2.jsx"],
-  "implementation_plan": ["Step 1", "Step 2", "Step 3"],
-  "challenges": ["Challenge 1", "Challenge 2"],
-  "can_implement": true/false
-}}
-"""
 
-    # Try models in order of preference with fallback
-    openai_models = ["gpt-5-mini", "gpt-4-turbo", "gpt-4", "gpt-3.5-turbo"]
-    anthropic_models = ["claude-3-5-sonnet-20241022", "claude-3-opus-20240229", "claude-3-sonnet-20240229"]
+def _stream_timeout():
+    """Build the per-request timeout for streamed responses."""
+    import httpx  # Installed with both AI SDKs
+    return httpx.Timeout(FIRST_TOKEN_TIMEOUT, connect=INIT_TIMEOUT)
+
+
+def _collect_stream(model: str, text_chunks) -> str:
+    """Accumulate streamed text, logging progress as it arrives."""
+    buf = io.StringIO()
+    next_report = PROGRESS_INTERVAL
+    for text in text_chunks:
+        if not text:
+            continue
+        if buf.tell() == 0:
+            print(f"Receiving response from {model}...")
+        buf.write(text)
+        if buf.tell() >= next_report:
+            print(f"  ...{buf.tell()} chars received")
+            next_report += PROGRESS_INTERVAL
+    print(f"Response complete: {buf.tell()} chars")
+    return buf.getvalue()
+
+
+# OpenAI model families that accept a json_schema response format
+STRUCTURED_OUTPUT_MODELS = ("gpt-4o", "gpt-4.1", "gpt-5", "o3", "o4")
+
+
+def _send_openai(client: Any, model: str, context_prompt: str, task_prompt: str,
+                 temperature: float, max_tokens: int,
+                 schema: Optional[ResponseSchema] = None) -> Union[str, Dict[str, Any]]:
+    """
+    Stream the shared context and task prompt to an OpenAI model and return the raw text.
+    
+    With a ``schema``, models that support structured outputs are held to
+    it; older models fall back to the JSON object response format.
+    """
+    if schema is None:
+        extra_args = {}
+    elif model.startswith(STRUCTURED_OUTPUT_MODELS):
+        extra_args = {"response_format": {
+            "type": "json_schema",
+            "json_schema": {"name": schema.name, "schema": schema.schema, "strict": True},
+        }}
+    else:
+        extra_args = {"response_format": {"type": "json_object"}}
+    stream = client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": context_prompt},
+            {"role": "user", "content": task_prompt}
+        ],
+        temperature=temperature,
+        extra_body={"prompt_cache_key": OPENAI_PROMPT_CACHE_KEY},
+        stream=True,
+        timeout=_stream_timeout(),
+        **extra_args
+    )
+    return _collect_stream(
+        model, (chunk.choices[0].delta.content for chunk in stream if chunk.choices)
+    )
+
+
+def _send_anthropic(client: Any, model: str, context_prompt: str, task_prompt: str,
+                    temperature: float, max_tokens: int,
+                    schema: Optional[ResponseSchema] = None) -> Union[str, Dict[str, Any]]:
+    """
+    Stream the shared context and task prompt to an Anthropic model.
     
+    Returns the raw text, or with a ``schema`` the input of a forced tool
+    call, which the SDK has already decoded. Anthropic keeps its default
+    temperature, so that argument is accepted for a uniform signature only.
+    """
+    extra_args = {}
+    if schema is not None:
+        extra_args = {
+            "tools": [{"name": schema.name, "description": schema.description, "input_schema": schema.schema}],
+            "tool_choice": {"type": "tool", "name": schema.name},
+        }
+    with client.messages.stream(
+        model=model,
+        max_tokens=max_tokens,
+        system=anthropic_cached_system(context_prompt),
+        messages=[{"role": "user", "content": task_prompt}],
+        extra_headers=ANTHROPIC_PROMPT_CACHE_HEADERS,
+        timeout=_stream_timeout(),
+        **extra_args
+    ) as stream:
+        if schema is None:
+            return _collect_stream(model, stream.text_stream)
+        _collect_stream(model, (event.partial_json for event in stream if event.type == "input_json"))
+        message = stream.get_final_message()
+    
+    if message.stop_reason == "max_tokens":
+        raise ResponseFormatError(f"Tool input cut off at {max_tokens} tokens")
+    for block in message.content:
+        if block.type == "tool_use":
+            return block.input
+    raise ResponseFormatError(f"Response did not call {schema.name}")
+
+
+# Parsed responses of individual AI calls, keyed by model and full prompt
+CALL_CACHE_DIR = Path(".cache/ai_calls")
+CALL_CACHE_TTL = 7 * 24 * 60 * 60  # 7 days
+
+
+def _call_cache_key(model: str, context_prompt: str, task_prompt: str, temperature: float, max_tokens: int) -> str:
+    return hashlib.sha256(
+        f"{model}|{context_prompt}|{task_prompt}|{temperature}|{max_tokens}".encode("utf-8")
+    ).hexdigest()
+
+
+def _call_cache_enabled() -> bool:
+    return os.getenv("AI_CACHE_DISABLE", "") not in ("1", "true", "yes")
+
+
+def _load_call_cache(key: str) -> Optional[Dict[str, Any]]:
+    """Return a cached call result younger than CALL_CACHE_TTL, or None."""
+    cache_file = CALL_CACHE_DIR / f"{key}.json"
     try:
-        if isinstance(client, openai.OpenAI):
-            model = get_openai_model()
-            # If user specified a model, try it first, then fallback
-            if model not in openai_models:
-                models_to_try = [model] + openai_models
-            else:
-                models_to_try = openai_models
-            
-            last_error = None
-            for model_to_try in models_to_try:
-                try:
-                    print(f"Trying OpenAI model: {model_to_try}")
-                    response = client.chat.completions.create(
-                        model=model_to_try,
-                        messages=[
-                            {"role": "system", "content": "You are an expert software developer. Always respond with valid JSON."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        temperature=0.3,
-                        response_format={"type": "json_object"}
-                    )
-                    raw_content = response.choices[0].message.content
-                    result = parse_json_response(raw_content)
-                    print(f"Successfully used model: {model_to_try}")
-                    return result
-                except Exception as model_error:
-                    last_error = model_error
-                    if "model_not_found" in str(model_error) or "does not exist" in str(model_error):
-                        print(f"Model {model_to_try} not available, trying next...")
-                        continue
-                    else:
-                        # Other error, don't try other models
-                        raise
-            
-            # If we get here, all models failed
-            raise last_error if last_error else Exception("All models failed")
+        if time.time() - cache_file.stat().st_mtime > CALL_CACHE_TTL:
+            return None
+        with open(cache_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _save_call_cache(key: str, result: Dict[str, Any]) -> None:
+    try:
+        CALL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(CALL_CACHE_DIR / f"{key}.json", "w", encoding="utf-8") as f:
+            json.dump(result, f)
+    except OSError as e:
+        print(f"Warning: Could not write AI call cache: {e}")
+
+
+class ResponseFormatError(ValueError):
+    """Raised when a delimited AI response is incomplete or malformed."""
+
+
+_FILE_SECTION_RE = re.compile(r"^===== FILE: (.+?) =====\n(.*?)\n===== END FILE: \1 =====$", re.S | re.M)
+_FILE_HEADER_RE = re.compile(r"^===== FILE: .+? =====$", re.M)
+_SUMMARY_RE = re.compile(r"^===== SUMMARY =====\n(.*?)(?:\n===== NOTES =====\n(.*))?\Z", re.S | re.M)
+
+
+def parse_delimited_response(content: str) -> Dict[str, Any]:
+    """
+    Parse FILE/END FILE sections plus optional SUMMARY/NOTES from an AI response.
+    
+    Returns a dict shaped like the JSON responses: ``files``, ``summary`` and
+    ``notes``.
+    
+    Raises:
+        ResponseFormatError: If the response has no file section, or a file
+            section is not closed, which means the response was truncated
+    """
+    # The newline before each END marker is part of the delimiter, so restore
+    # the conventional trailing newline on the file body
+    files = {
+        path: body if not body or body.endswith("\n") else body + "\n"
+        for path, body in _FILE_SECTION_RE.findall(content)
+    }
+    if len(_FILE_HEADER_RE.findall(content)) != len(files):
+        raise ResponseFormatError("Unterminated file section in response")
+    if not files:
+        raise ResponseFormatError("No file sections in response")
+    
+    result: Dict[str, Any] = {"files": files}
+    summary = _SUMMARY_RE.search(content)
+    if summary:
+        result["summary"] = summary.group(1).strip()
+        if summary.group(2):
+            result["notes"] = summary.group(2).strip()
+    return result
+
+
+def _call_with_fallback(provider: Provider, context_prompt: str, task_prompt: str, temperature: float = 0.3,
+                        max_tokens: int = 2000, delimited: bool = False,
+                        schema: Optional[ResponseSchema] = None) -> Dict[str, Any]:
+    """
+    Send a prompt, falling back through the candidate models, and return the parsed result.
+    
+    Responses are parsed as JSON, or with ``delimited`` as FILE/END FILE
+    sections (see parse_delimited_response). A ``schema`` makes the provider
+    enforce the shape of a JSON reply.
+    
+    Models that report ``model_not_found`` are remembered for the rest of the
+    run and the first model that succeeds is tried first on later calls.
+    Rate limit errors fail immediately. Schema-bound and delimited responses
+    only fail to parse when cut off at the token limit or, for delimited
+    ones, written in the wrong format, so those move straight on to the
+    next model.
+    
+    Parsed results are cached on disk per model and prompt for
+    CALL_CACHE_TTL; set ``AI_CACHE_DISABLE=1`` to bypass the cache.
+    """
+    kind = provider.name
+    warmup = _warmup_threads.pop(kind, None)
+    if warmup is not None:
+        warmup.join(timeout=10)
+    elif kind not in _probed_kinds and kind not in _preferred_model:
+        _probed_kinds.add(kind)
+        _probe_models(provider, _models_to_try(provider))
+    
+    use_cache = _call_cache_enabled()
+    last_error = None
+    for model_to_try in _models_to_try(provider):
+        cache_key = _call_cache_key(model_to_try, context_prompt, task_prompt, temperature, max_tokens)
+        cached = _load_call_cache(cache_key) if use_cache else None
+        if cached is not None:
+            print(f"Using cached response from model: {model_to_try}")
+            _preferred_model[kind] = model_to_try
+            return cached
         
-        elif isinstance(client, anthropic.Anthropic):
-            model = get_anthropic_model()
-            # If user specified a model, try it first, then fallback
-            if model not in anthropic_models:
-                models_to_try = [model] + anthropic_models
+        try:
+            print(f"Trying {provider.label} model: {model_to_try}")
+            try:
+                raw_content = provider.send(
+                    model_to_try, context_prompt, task_prompt, temperature, max_tokens, schema
+                )
+                if isinstance(raw_content, dict):
+                    result = raw_content
+                elif delimited:
+                    result = parse_delimited_response(raw_content)
+                else:
+                    # Schema-bound OpenAI replies are pure JSON
+                    result = parse_json_response(raw_content, json_mode=schema is not None)
+                print(f"Successfully used model: {model_to_try}")
+            except (json.JSONDecodeError, ResponseFormatError) as parse_error:
+                if not (schema or delimited):
+                    raise
+                # A response cut off at the token limit or missing its file
+                # sections; retrying the same model would most likely repeat it
+                print(f"Unusable response from {model_to_try}, trying next model: {parse_error}")
+                last_error = parse_error
+                continue
+            _preferred_model[kind] = model_to_try
+            if use_cache:
+                _save_call_cache(cache_key, result)
+            return result
+        except Exception as model_error:
+            last_error = model_error
+            error_str = str(model_error)
+            if _is_model_not_found(error_str):
+                print(f"Model {model_to_try} not available, trying next...")
+                _model_blacklist.add(model_to_try)
+                continue
+            elif _is_rate_limit(error_str):
+                print(f"Rate limit error with {model_to_try}: {error_str}")
+                # Rate limit errors should fail immediately, don't try other models
+                raise Exception(f"Rate limit exceeded: {error_str}") from model_error
             else:
-                models_to_try = anthropic_models
-            
-            last_error = None
-            for model_to_try in models_to_try:
-                try:
-                    print(f"Trying Anthropic model: {model_to_try}")
-                    response = client.messages.create(
-                        model=model_to_try,
-                        max_tokens=2000,
-                        system="You are an expert software developer. Always respond with valid JSON.",
-                        messages=[{"role": "user", "content": prompt}]
-                    )
-                    raw_content = response.content[0].text
-                    result = parse_json_response(raw_content)
-                    print(f"Successfully used model: {model_to_try}")
-                    return result
-                except Exception as model_error:
-                    last_error = model_error
-                    if "model_not_found" in str(model_error) or "does not exist" in str(model_error):
-                        print(f"Model {model_to_try} not available, trying next...")
-                        continue
-                    else:
-                        # Other error, don't try other models
-                        raise
-            
-            # If we get here, all models failed
-            raise last_error if last_error else Exception("All models failed")
+                # Other error, don't try other models
+                raise
     
+    error_msg = f"All {provider.label} models failed"
+    if last_error:
+        error_msg = f"{error_msg}: {str(last_error)}"
+    raise Exception(error_msg) from last_error
+
+
+def analyze_and_implement_with_ai(provider: Provider, context_prompt: str) -> Dict[str, Any]:
+    """
+    Analyze the issue and draft the implementation in a single AI call.
+    
+    The model has not seen the contents of existing files at this point, so
+    it only returns file contents for files it creates from scratch. Changes
+    to existing files still go through implement_changes_with_ai.
+    """
+    result = _request_analysis(provider, context_prompt, COMBINED_TASK_PROMPT, COMBINED_SCHEMA, max_tokens=8000)
+    files = result.get("files")
+    if isinstance(files, list):
+        result["files"] = {entry["path"]: entry["content"] for entry in files if entry.get("path")}
+    analysis = result.get("analysis") or {}
+    analysis.setdefault("can_implement", result.get("can_implement", False))
+    if "error" in result:
+        analysis["error"] = result["error"]
+    result["analysis"] = analysis
+    result.setdefault("can_implement", analysis["can_implement"])
+    return result
+
+
+def _request_analysis(provider: Provider, context_prompt: str, task_prompt: str, schema: ResponseSchema,
+                      max_tokens: int = 2000) -> Dict[str, Any]:
+    """Send an analysis prompt with model fallback and return the parsed JSON."""
+    try:
+        return _call_with_fallback(
+            provider, context_prompt, task_prompt, temperature=0.3, max_tokens=max_tokens, schema=schema
+        )
     except Exception as e:
         print(f"Error calling AI API: {e}")
         return {"can_implement": False, "error": str(e)}
+
+
+MAX_FILE_SIZE = 50000  # Limit each file to ~50KB to avoid token limits
+
+
+# Stands in for the content of a file the analysis wants created
+MISSING_FILE_MARKER = "<FILE_DOES_NOT_EXIST_YET>"
+
+
+def _read_file_for_prompt(file_path: str) -> Optional[str]:
+    """
+    Read at most MAX_FILE_SIZE bytes of a file, marking it if truncated.
     
-    return {"can_implement": False, "error": "Unknown AI client type"}
+    Missing files are returned as MISSING_FILE_MARKER so the prompt tells the
+    model to create them; other read errors return None.
+    """
+    try:
+        with open(file_path, "rb") as f:
+            # One extra byte tells us whether the file was cut off
+            data = f.read(MAX_FILE_SIZE + 1)
+            size = os.fstat(f.fileno()).st_size if len(data) > MAX_FILE_SIZE else len(data)
+    except FileNotFoundError:
+        return MISSING_FILE_MARKER
+    except Exception as e:
+        print(f"Warning: Could not read {file_path}: {e}")
+        return None
+    
+    content = data[:MAX_FILE_SIZE].decode("utf-8", "replace")
+    if size > MAX_FILE_SIZE:
+        print(f"Warning: {file_path} is larger than {MAX_FILE_SIZE} bytes, truncating")
+        content += f"\n# ... [truncated, {size - MAX_FILE_SIZE} more bytes] ..."
+    return content
+
+
+def prefetch_issue_files(issue_title: str, issue_body: str, limit: int = 10) -> Dict[str, Optional[str]]:
+    """
+    Read source files whose path or name is mentioned in the issue.
+    
+    Runs in the background during the analysis call, so files the analysis
+    is likely to select are already in memory when the implement step needs
+    them. Keys are normalized relative paths.
+    """
+    issue_text = f"{issue_title}\n{issue_body}"
+    mentioned = []
+    for file_path in _iter_source_files(".", limit=2000):
+        rel_path = os.path.normpath(file_path)
+        if rel_path in issue_text or os.path.basename(rel_path) in issue_text:
+            mentioned.append(rel_path)
+            if len(mentioned) >= limit:
+                break
+    return {rel_path: _read_file_for_prompt(rel_path) for rel_path in mentioned}
 
 
-def implement_changes_with_ai(client: Any, analysis: Dict[str, Any], issue_title: str, issue_body: str, repo_context: str) -> bool:
-    """Use AI to implement the changes based on the analysis."""
+def format_file_sections(file_contents: Dict[str, str]) -> str:
+    """
+    Format file contents as delimited plain-text sections for the prompt.
+    
+    Unlike a JSON dump this keeps newlines and quotes unescaped, which
+    tokenizes considerably shorter.
+    """
+    return "\n\n".join(
+        f"===== FILE: {path} =====\n{content}\n===== END FILE: {path} ====="
+        for path, content in file_contents.items()
+    )
+
+
+def implement_changes_with_ai(provider: Provider, analysis: Dict[str, Any], context_prompt: str,
+                              prefetched: Optional[Dict[str, Optional[str]]] = None) -> bool:
+    """
+    Use AI to implement the changes based on the analysis and the shared context prompt.
+    
+    ``prefetched`` maps normalized paths to contents already read by
+    prefetch_issue_files; only the remaining files are read here.
+    """
+    prefetched = prefetched or {}
     
     files_to_modify = analysis.get("files_to_modify", [])
     if not files_to_modify:
         print("No files identified for modification")
         return False
     
-    # Read existing files (limit size to avoid rate limits)
+    # Read the remaining files concurrently (limit size to avoid rate limits);
+    # files that do not exist yet are listed with MISSING_FILE_MARKER
     file_contents = {}
-    max_file_size = 50000  # Limit each file to ~50KB to avoid token limits
+    files_to_read = []
     for file_path in files_to_modify:
-        path = Path(file_path)
-        if path.exists():
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    content = f.read()
-                    # Truncate if too large
-                    if len(content) > max_file_size:
-                        print(f"Warning: {file_path} is large ({len(content)} chars), truncating to {max_file_size} chars")
-                        content = content[:max_file_size] + "\n# ... (file truncated due to size limits) ..."
+        content = prefetched.get(os.path.normpath(file_path))
+        if content is not None:
+            file_contents[file_path] = content
+        else:
+            files_to_read.append(file_path)
+    if files_to_read:
+        with ThreadPoolExecutor(max_workers=min(len(files_to_read), 8)) as executor:
+            for file_path, content in zip(files_to_read, executor.map(_read_file_for_prompt, files_to_read)):
+                if content is not None:
                     file_contents[file_path] = content
-            except Exception as e:
-                print(f"Warning: Could not read {file_path}: {e}")
     
-    prompt = f"""You are an expert software developer working on the PolarVortex project.
+    task_prompt = IMPLEMENT_TASK_TEMPLATE.substitute(
+        analysis=_json_dumps_indented(analysis),
+        files=format_file_sections(file_contents),
+    )
 
-## Project Context
-{repo_context}
+    try:
+        result = _call_with_fallback(
+            provider, context_prompt, task_prompt, temperature=0.2, max_tokens=8000, delimited=True
+        )
+        return write_result_files(result)
+        
+    except Exception as e:
+        print(f"Error implementing changes: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    
+    return False
 
-## Issue to Address
-**Title:** {issue_title}
-**Description:** {issue_body}
 
-## Analysis
-{json.dumps(analysis, indent=2)}
+# Issue contents whose changes already reached a pull request in an earlier run
+PROCESSED_LOG = Path(".ai-state/processed.jsonl")
 
-## Current Files
-{json.dumps(file_contents, indent=2)}
 
-## Your Task
-Implement the changes needed to address this issue. For each file that needs modification, provide the complete updated file content.
+def issue_content_key(issue_title: str, issue_body: str) -> str:
+    """Hash the issue title and body, ignoring labels, assignees and the repository state."""
+    return hashlib.sha256(f"{issue_title}\n{issue_body}".encode("utf-8")).hexdigest()
 
-Respond in JSON format:
-{{
-  "files": {{
-    "path/to/file1.py": "complete file content here",
-    "path/to/file2.jsx": "complete file content here"
-  }},
-  "summary": "Brief summary of changes made",
-  "notes": "Any important notes about the implementation"
-}}
-"""
 
-    # Try models in order of preference with fallback
-    openai_models = ["gpt-5-mini", "gpt-4-turbo", "gpt-4", "gpt-3.5-turbo"]
-    anthropic_models = ["claude-3-5-sonnet-20241022", "claude-3-opus-20240229", "claude-3-sonnet-20240229"]
-    
-    result = None
-    
+def load_processed_keys() -> Set[str]:
+    """Return the issue content keys recorded once an earlier run opened a pull request."""
+    keys = set()
     try:
-        if isinstance(client, openai.OpenAI):
-            model = get_openai_model()
-            # If user specified a model, try it first, then fallback
-            if model not in openai_models:
-                models_to_try = [model] + openai_models
-            else:
-                models_to_try = openai_models
-            
-            last_error = None
-            for model_to_try in models_to_try:
+        with open(PROCESSED_LOG, "r", encoding="utf-8") as f:
+            for line in f:
                 try:
-                    print(f"Trying OpenAI model: {model_to_try}")
-                    response = client.chat.completions.create(
-                        model=model_to_try,
-                        messages=[
-                            {"role": "system", "content": "You are an expert software developer. Always respond with valid JSON. Provide complete file contents, not diffs. Ensure all strings are properly escaped for JSON."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        temperature=0.2,
-                        response_format={"type": "json_object"}
-                    )
-                    raw_content = response.choices[0].message.content
-                    try:
-                        result = parse_json_response(raw_content)
-                        print(f"Successfully used model: {model_to_try}")
-                        break
-                    except json.JSONDecodeError as json_error:
-                        # If JSON parsing fails, try to ask the AI to fix it
-                        print(f"JSON parsing failed, attempting to fix: {json_error}")
-                        try:
-                            fix_response = client.chat.completions.create(
-                                model=model_to_try,
-                                messages=[
-                                    {"role": "system", "content": "You are a JSON validator. Fix the JSON and return ONLY valid JSON, no explanations."},
-                                    {"role": "user", "content": f"Fix this JSON:\n\n{raw_content}"}
-                                ],
-                                temperature=0.1,
-                                response_format={"type": "json_object"}
-                            )
-                            fixed_content = fix_response.choices[0].message.content
-                            result = parse_json_response(fixed_content)
-                            print(f"Successfully fixed and parsed JSON with model: {model_to_try}")
-                            break
-                        except Exception as fix_error:
-                            print(f"Failed to fix JSON: {fix_error}")
-                            error_str = str(fix_error)
-                            # If it's a rate limit error, fail immediately
-                            if "rate_limit" in error_str.lower() or "429" in error_str or "tokens per min" in error_str.lower():
-                                raise Exception(f"Rate limit exceeded while fixing JSON: {error_str}") from fix_error
-                            # Continue to next model for other errors
-                            last_error = json_error
-                            continue
-                except Exception as model_error:
-                    last_error = model_error
-                    error_str = str(model_error)
-                    if "model_not_found" in error_str or "does not exist" in error_str:
-                        print(f"Model {model_to_try} not available, trying next...")
-                        continue
-                    elif "rate_limit" in error_str.lower() or "429" in error_str or "tokens per min" in error_str.lower():
-                        print(f"Rate limit error with {model_to_try}: {error_str}")
-                        # Rate limit errors should fail immediately, don't try other models
-                        raise Exception(f"Rate limit exceeded: {error_str}") from model_error
-                    else:
-                        # Other error, don't try other models
-                        raise
-            
-            if result is None:
-                error_msg = "All OpenAI models failed"
-                if last_error:
-                    error_msg = f"{error_msg}: {str(last_error)}"
-                raise Exception(error_msg) from last_error
-        
-        elif isinstance(client, anthropic.Anthropic):
-            model = get_anthropic_model()
-            # If user specified a model, try it first, then fallback
-            if model not in anthropic_models:
-                models_to_try = [model] + anthropic_models
-            else:
-                models_to_try = anthropic_models
-            
-            last_error = None
-            for model_to_try in models_to_try:
-                try:
-                    print(f"Trying Anthropic model: {model_to_try}")
-                    response = client.messages.create(
-                        model=model_to_try,
-                        max_tokens=8000,
-                        system="You are an expert software developer. Always respond with valid JSON. Provide complete file contents, not diffs. Ensure all strings are properly escaped for JSON.",
-                        messages=[{"role": "user", "content": prompt}]
-                    )
-                    raw_content = response.content[0].text
-                    try:
-                        result = parse_json_response(raw_content)
-                        print(f"Successfully used model: {model_to_try}")
-                        break
-                    except json.JSONDecodeError as json_error:
-                        # If JSON parsing fails, try to ask the AI to fix it
-                        print(f"JSON parsing failed, attempting to fix: {json_error}")
-                        try:
-                            fix_response = client.messages.create(
-                                model=model_to_try,
-                                max_tokens=8000,
-                                system="You are a JSON validator. Fix the JSON and return ONLY valid JSON, no explanations.",
-                                messages=[{"role": "user", "content": f"Fix this JSON:\n\n{raw_content}"}]
-                            )
-                            fixed_content = fix_response.content[0].text
-                            result = parse_json_response(fixed_content)
-                            print(f"Successfully fixed and parsed JSON with model: {model_to_try}")
-                            break
-                        except Exception as fix_error:
-                            print(f"Failed to fix JSON: {fix_error}")
-                            error_str = str(fix_error)
-                            # If it's a rate limit error, fail immediately
-                            if "rate_limit" in error_str.lower() or "429" in error_str or "tokens per min" in error_str.lower():
-                                raise Exception(f"Rate limit exceeded while fixing JSON: {error_str}") from fix_error
-                            # Continue to next model for other errors
-                            last_error = json_error
-                            continue
-                except Exception as model_error:
-                    last_error = model_error
-                    error_str = str(model_error)
-                    if "model_not_found" in error_str or "does not exist" in error_str:
-                        print(f"Model {model_to_try} not available, trying next...")
-                        continue
-                    elif "rate_limit" in error_str.lower() or "429" in error_str or "tokens per min" in error_str.lower():
-                        print(f"Rate limit error with {model_to_try}: {error_str}")
-                        # Rate limit errors should fail immediately, don't try other models
-                        raise Exception(f"Rate limit exceeded: {error_str}") from model_error
-                    else:
-                        # Other error, don't try other models
-                        raise
-            
-            if result is None:
-                error_msg = "All Anthropic models failed"
-                if last_error:
-                    error_msg = f"{error_msg}: {str(last_error)}"
-                raise Exception(error_msg) from last_error
+                    keys.add(json.loads(line)["key"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+    except OSError:
+        pass
+    return keys
+
+
+def record_processed(key: str, issue_number: str) -> None:
+    """Append the issue content key of a run whose pull request is open to the processed log."""
+    try:
+        PROCESSED_LOG.parent.mkdir(parents=True, exist_ok=True)
+        with open(PROCESSED_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"key": key, "issue": issue_number, "time": int(time.time())}) + "\n")
+    except OSError as e:
+        print(f"Warning: Could not record processed issue: {e}")
+
+
+# Process umask, read once at import while single-threaded
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _write_file_atomic(file_path: str, content: str) -> str:
+    """Write a file through a temp file in the same directory and swap it into place."""
+    path = Path(file_path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content.encode("utf-8"))
+        if path.exists():
+            # Keep the original file's permissions (e.g. executable scripts)
+            os.chmod(tmp_path, path.stat().st_mode & 0o7777)
         else:
-            return False
-        
-        if result is None:
-            return False
-        
-        # Write files
-        files_written = 0
-        for file_path, content in result.get("files", {}).items():
-            path = Path(file_path)
-            path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(content)
-            
-            files_written += 1
-            print(f"Updated: {file_path}")
-        
-        if files_written > 0:
-            print(f"\nSummary: {result.get('summary', 'Changes implemented')}")
-            if result.get("notes"):
-                print(f"Notes: {result.get('notes')}")
-            return True
-        
-    except Exception as e:
-        print(f"Error implementing changes: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+            # mkstemp creates files as 0600; use the usual umask-based mode
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return file_path
+
+
+def write_result_files(result: Dict[str, Any]) -> bool:
+    """Write the files returned by the AI to disk. Returns True if any were written."""
+    files = result.get("files", {})
+    
+    # Create each parent directory once, then write the files concurrently
+    for parent in {Path(file_path).parent for file_path in files}:
+        parent.mkdir(parents=True, exist_ok=True)
+    
+    files_written = 0
+    if files:
+        with ThreadPoolExecutor(max_workers=min(len(files), 8)) as executor:
+            for file_path in executor.map(_write_file_atomic, files.keys(), files.values()):
+                files_written += 1
+                print(f"Updated: {file_path}")
+    
+    if files_written > 0:
+        clear_repo_context_cache()
+        print(f"\nSummary: {result.get('summary', 'Changes implemented')}")
+        if result.get("notes"):
+            print(f"Notes: {result.get('notes')}")
+        return True
     
     return False
 
 
+def open_github_output() -> Optional[int]:
+    """
+    Open the GitHub Actions output file for appending; closed at exit.
+    
+    Returns None outside GitHub Actions, where outputs go to stdout.
+    """
+    path = os.environ.get("GITHUB_OUTPUT")
+    if not path:
+        return None
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+    atexit.register(os.close, fd)
+    return fd
+
+
+def write_github_output(fd: Optional[int], line: str) -> None:
+    """Append a ``key=value`` line to the GitHub Actions output in a single write."""
+    if fd is None:
+        sys.stdout.write(f"{line}\n")
+        return
+    os.write(fd, f"{line}\n".encode("utf-8"))
+
+
 def main():
     """Main entry point for the AI issue processor."""
     issue_number = os.getenv("ISSUE_NUMBER")
@@ -536,19 +1074,41 @@ def main():
     
     print(f"Processing issue #{issue_number}: {issue_title}")
     
+    # Resolve the GitHub Actions output file once for every exit path
+    output_fd = open_github_output()
+    
+    # Label, assignee and other events that leave the issue text unchanged
+    # need no new work once its pull request is open. Until then (e.g. the
+    # push or pull request step failed) the issue is processed again, and the
+    # AI call cache answers the repeated prompts without new API requests.
+    if issue_content_key(issue_title, issue_body) in load_processed_keys():
+        print("No change to the issue since its pull request was opened. Skipping.")
+        write_github_output(output_fd, "has_changes=false")
+        sys.exit(0)
+    
     # Get AI client
-    client = get_ai_client()
-    if not client:
+    provider = get_ai_client()
+    if provider is None:
         print("No AI client available. Exiting.")
         sys.exit(0)
     
+    # Warm up the API connection while the repository context is gathered
+    start_warmup(provider)
+    
     # Get repository context
     print("Gathering repository context...")
     repo_context = get_repo_context()
+    # Built once so both AI calls send a byte-identical, cacheable prefix
+    context_prompt = build_context_prompt(issue_title, issue_body, repo_context)
     
-    # Analyze issue
+    # Analyze issue, drafting new files in the same round trip. Files named in
+    # the issue are read in the background meanwhile.
+    prefetch_executor = ThreadPoolExecutor(max_workers=1)
+    prefetch = prefetch_executor.submit(prefetch_issue_files, issue_title, issue_body)
+    prefetch_executor.shutdown(wait=False)
     print("Analyzing issue with AI...")
-    analysis = analyze_issue_with_ai(client, issue_title, issue_body, repo_context)
+    combined = analyze_and_implement_with_ai(provider, context_prompt)
+    analysis = combined["analysis"]
     
     if not analysis.get("can_implement", False):
         print(f"Issue cannot be automatically implemented: {analysis.get('error', 'Unknown reason')}")
@@ -560,28 +1120,43 @@ def main():
     # Implement changes
     print("Implementing changes with AI...")
     try:
-        success = implement_changes_with_ai(client, analysis, issue_title, issue_body, repo_context)
+        files_to_modify = analysis.get("files_to_modify", [])
+        only_new_files = bool(files_to_modify) and not any(Path(p).exists() for p in files_to_modify)
+        if only_new_files and combined.get("files"):
+            # Every file is new, so the combined response is already complete
+            success = write_result_files(combined)
+        else:
+            try:
+                prefetched = prefetch.result(timeout=10)
+            except Exception:
+                prefetched = {}
+            success = implement_changes_with_ai(provider, analysis, context_prompt, prefetched)
         
         if success:
             print("Changes implemented successfully")
-            # Set output for GitHub Actions
-            with open(os.getenv("GITHUB_OUTPUT", "/dev/stdout"), "a") as f:
-                f.write("has_changes=true\n")
-            sys.exit(0)
         else:
             print("No changes were made")
-            with open(os.getenv("GITHUB_OUTPUT", "/dev/stdout"), "a") as f:
-                f.write("has_changes=false\n")
-            sys.exit(0)
+        # Set output for GitHub Actions
+        write_github_output(output_fd, f"has_changes={'true' if success else 'false'}")
+        sys.exit(0)
     except Exception as e:
         print(f"ERROR: Failed to implement changes: {e}")
         import traceback
         traceback.print_exc()
         # Set output and exit with error code
-        with open(os.getenv("GITHUB_OUTPUT", "/dev/stdout"), "a") as f:
-            f.write("has_changes=false\n")
+        write_github_output(output_fd, "has_changes=false")
         sys.exit(1)
 
 
+def record_pull_request_opened():
+    """Record the current issue content once the workflow has opened its pull request."""
+    issue_number = os.getenv("ISSUE_NUMBER", "")
+    content_key = issue_content_key(os.getenv("ISSUE_TITLE", ""), os.getenv("ISSUE_BODY", ""))
+    record_processed(content_key, issue_number)
+
+
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:] == ["--record-processed"]:
+        record_pull_request_opened()
+    else:
+        main()
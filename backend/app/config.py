@@ -1,8 +1,93 @@
+import copy
+import hashlib
+import json
+import mmap
 import os
+import tempfile
 import yaml
-from typing import List, Dict, Any
+from types import MappingProxyType
+from typing import Any, Dict, Final, List, Mapping, Optional, Tuple
 from pathlib import Path
 
+# Prefer the libyaml-backed loader/dumper; fall back to the pure-Python ones
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+# Configuration files at least this large are parsed through mmap
+YAML_MMAP_MIN_SIZE: Final[int] = 64 * 1024
+
+# Immutable defaults shared by Settings and Config
+DEFAULT_CORS_ORIGINS: Final[Tuple[str, ...]] = (
+    "http://localhost:3000",
+    "http://127.0.0.1:3000",
+    "http://localhost:5173",  # Vite dev server
+    "http://127.0.0.1:5173",
+)
+
+DEFAULT_ARDUINO_PORTS: Final[Tuple[str, ...]] = (
+    '/dev/ttyUSB0',
+    '/dev/ttyACM0',
+    'COM3',
+    'COM4',
+    'COM5',
+    'COM6',
+    'COM7',
+    'COM8',
+)
+
+DEFAULT_ALLOWED_IMAGE_TYPES: Final[Tuple[str, ...]] = (
+    'image/jpeg',
+    'image/jpg',
+    'image/png',
+    'image/gif',
+    'image/bmp',
+)
+
+
+def config_cache_path(config_path: Path) -> Path:
+    """Path of the parsed configuration cached next to a YAML configuration file"""
+    return config_path.with_name(config_path.name + '.cache.json')
+
+
+def load_config_cache(cache_path: Path) -> Dict[str, Any]:
+    """Return the cached stamp, data and (if any) digest of the last parse, or an empty dict"""
+    # Plain JSON, so a tampered cache in the writable config directory can at
+    # worst supply data the YAML file could have supplied, never run code
+    try:
+        cached = json.loads(cache_path.read_bytes())
+    except Exception:
+        return {}
+    if not isinstance(cached, dict) or "data" not in cached or not isinstance(cached.get("stamp"), list):
+        return {}
+    cached["stamp"] = tuple(cached["stamp"])
+    return cached
+
+
+def save_config_cache(cache_path: Path, cache: Dict[str, Any]) -> None:
+    """Atomically write a parse cache for load_config_cache; best effort"""
+    try:
+        payload = json.dumps(cache, separators=(',', ':'))
+    except (TypeError, ValueError):
+        # E.g. YAML dates, which JSON cannot hold
+        return
+    if json.loads(payload)["data"] != cache["data"]:
+        # Tuples or non-string keys would come back changed; parse the YAML instead
+        return
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, prefix=cache_path.name, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                file.write(payload)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        pass
+
+
 class Settings:
     """Application settings for PolarVortex backend"""
     
@@ -13,44 +98,24 @@ class Settings:
     API_PORT: int = 8000
     
     # CORS Configuration
-    CORS_ORIGINS: List[str] = [
-        "http://localhost:3000",
-        "http://127.0.0.1:3000",
-        "http://localhost:5173",  # Vite dev server
-        "http://127.0.0.1:5173"
-    ]
+    CORS_ORIGINS: Tuple[str, ...] = DEFAULT_CORS_ORIGINS
     
     # Arduino Configuration
     ARDUINO_BAUDRATE: int = 115200
     ARDUINO_TIMEOUT: int = 1
-    ARDUINO_PORTS: List[str] = [
-        '/dev/ttyUSB0',
-        '/dev/ttyACM0',
-        'COM3',
-        'COM4',
-        'COM5',
-        'COM6',
-        'COM7',
-        'COM8'
-    ]
+    ARDUINO_PORTS: Tuple[str, ...] = DEFAULT_ARDUINO_PORTS
     
     # Image Processing Configuration
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
-    ALLOWED_IMAGE_TYPES: List[str] = [
-        'image/jpeg',
-        'image/jpg',
-        'image/png',
-        'image/gif',
-        'image/bmp'
-    ]
+    ALLOWED_IMAGE_TYPES: Tuple[str, ...] = DEFAULT_ALLOWED_IMAGE_TYPES
     
     # Resolution presets
-    RESOLUTION_PRESETS = {
+    RESOLUTION_PRESETS: Mapping[str, Tuple[int, int]] = MappingProxyType({
         "low": (400, 300),
         "medium": (800, 600),
         "high": (1200, 900),
         "ultra": (1600, 1200)
-    }
+    })
     
     # File Storage
     PROCESSED_IMAGES_DIR: str = "processed_images"
@@ -70,19 +135,19 @@ class Settings:
     DEFAULT_INVERT: bool = False
     
     @classmethod
-    def get_arduino_ports(cls) -> List[str]:
+    def get_arduino_ports(cls) -> Tuple[str, ...]:
         """Get Arduino ports with environment variable override"""
         env_ports = os.getenv("ARDUINO_PORTS")
         if env_ports:
-            return env_ports.split(",")
+            return tuple(env_ports.split(","))
         return cls.ARDUINO_PORTS
     
     @classmethod
-    def get_cors_origins(cls) -> List[str]:
+    def get_cors_origins(cls) -> Tuple[str, ...]:
         """Get CORS origins with environment variable override"""
         env_origins = os.getenv("CORS_ORIGINS")
         if env_origins:
-            return env_origins.split(",")
+            return tuple(env_origins.split(","))
         return cls.CORS_ORIGINS
 
 # Create settings instance
@@ -92,10 +157,75 @@ settings = Settings()
 class Config:
     """Configuration class that loads settings from YAML file specified by PV_CONFIG environment variable"""
     
+    # Dotted config key of each public setting. Settings are resolved on
+    # first access and then stored in a slot of the same name; missing keys
+    # fall back to a copy of the value in _get_default_config.
+    _SCHEMA = {
+        "api_title": 'api.title',
+        "api_version": 'api.version',
+        "api_host": 'api.host',
+        "api_port": 'api.port',
+        "cors_origins": 'cors.origins',
+        "arduino_baudrate": 'arduino.baudrate',
+        "arduino_timeout": 'arduino.timeout',
+        "arduino_ports": 'arduino.ports',
+        "max_file_size": 'image_processing.max_file_size',
+        "allowed_image_types": 'image_processing.allowed_types',
+        "resolution_presets": 'image_processing.resolution_presets',
+        "local_storage": 'storage.local_storage',
+        "project_storage": 'storage.project_storage',
+        "processed_images_dir": 'storage.processed_images_dir',
+        "uploads_dir": 'storage.uploads_dir',
+        "log_level": 'logging.level',
+        "log_format": 'logging.format',
+        "ws_ping_interval": 'websocket.ping_interval',
+        "ws_ping_timeout": 'websocket.ping_timeout',
+        "default_threshold": 'plotting.default_threshold',
+        "default_dither": 'plotting.default_dither',
+        "default_invert": 'plotting.default_invert',
+    }
+    
+    __slots__ = ("_config_data", "_flat") + tuple(_SCHEMA)
+    
+    api_title: str
+    api_version: str
+    api_host: str
+    api_port: int
+    cors_origins: List[str]
+    arduino_baudrate: int
+    arduino_timeout: int
+    arduino_ports: List[str]
+    max_file_size: int
+    allowed_image_types: List[str]
+    resolution_presets: Dict[str, List[int]]
+    local_storage: str
+    project_storage: str
+    processed_images_dir: str
+    uploads_dir: str
+    log_level: str
+    log_format: str
+    ws_ping_interval: int
+    ws_ping_timeout: int
+    default_threshold: int
+    default_dither: bool
+    default_invert: bool
+    
     def __init__(self):
         """Initialize configuration by loading from YAML file"""
         self._config_data = {}
         self._load_config()
+        self._flat = self._flatten(self._config_data)
+    
+    @classmethod
+    def _flatten(cls, data: Dict[str, Any], prefix: str = '') -> Dict[str, Any]:
+        """Index every value, including intermediate sections, by its dotted key"""
+        flat = {}
+        for key, value in data.items():
+            dotted = f"{prefix}{key}"
+            flat[dotted] = value
+            if isinstance(value, dict):
+                flat.update(cls._flatten(value, f"{dotted}."))
+        return flat
     
     def _load_config(self):
         """Load configuration from YAML file specified by PV_CONFIG environment variable"""
@@ -110,13 +240,43 @@ class Config:
         if not config_path.exists():
                 self._create_default_config_file(config_path)
 
+        # Parsed configuration is cached next to the YAML file, keyed by its
+        # stat and, for rewrites that leave the content unchanged, its hash
+        cache_path = config_cache_path(config_path)
+        try:
+            yaml_stat = config_path.stat()
+        except OSError as e:
+            raise RuntimeError(f"Error loading configuration file: {e}")
+        stamp = (yaml_stat.st_mtime_ns, yaml_stat.st_size)
+        
+        cached = load_config_cache(cache_path)
+        if cached.get("stamp") == stamp:
+            self._config_data = cached["data"]
+            return
+
         try:
-            with open(config_path, 'r', encoding='utf-8') as file:
-                self._config_data = yaml.safe_load(file) or {}
+            with open(config_path, 'rb') as file:
+                if yaml_stat.st_size >= YAML_MMAP_MIN_SIZE:
+                    # Let the parser read large files straight from the page cache
+                    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        digest = self._parse_config(mapped, cached)
+                else:
+                    digest = self._parse_config(file.read(), cached)
         except yaml.YAMLError as e:
             raise ValueError(f"Invalid YAML configuration file: {e}")
         except Exception as e:
             raise RuntimeError(f"Error loading configuration file: {e}")
+        
+        save_config_cache(cache_path, {"stamp": stamp, "digest": digest, "data": self._config_data})
+    
+    def _parse_config(self, source, cached: Dict[str, Any]) -> str:
+        """Parse YAML source unless its hash matches the cached parse; returns the hex hash"""
+        digest = hashlib.blake2b(source, digest_size=16).hexdigest()
+        if cached.get("digest") == digest:
+            self._config_data = cached["data"]
+        else:
+            self._config_data = yaml.load(source, Loader=SafeLoader) or {}
+        return digest
     
     def _create_default_config_file(self, config_path: Path):
         """Create default configuration file with default values"""
@@ -124,20 +284,15 @@ class Config:
             # Ensure the directory exists
             config_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Get default configuration
-            default_config = self._get_default_config()
-            
             # Write the default configuration to file
             with open(config_path, 'w', encoding='utf-8') as file:
-                yaml.dump(default_config, file, default_flow_style=False, indent=2, sort_keys=False)
-            
-            # Set the config data to the defaults
-            self._config_data = default_config
+                yaml.dump(self._get_default_config(), file, Dumper=SafeDumper, default_flow_style=False, indent=2, sort_keys=False)
             
         except Exception as e:
             raise RuntimeError(f"Error creating default configuration file: {e}")
     
-    def _get_default_config(self) -> Dict[str, Any]:
+    @staticmethod
+    def _get_default_config() -> Dict[str, Any]:
         """Get default configuration values"""
         return {
             "api": {
@@ -147,26 +302,12 @@ class Config:
                 "port": 8000
             },
             "cors": {
-                "origins": [
-                    "http://localhost:3000",
-                    "http://127.0.0.1:3000",
-                    "http://localhost:5173",
-                    "http://127.0.0.1:5173"
-                ]
+                "origins": list(DEFAULT_CORS_ORIGINS)
             },
             "arduino": {
                 "baudrate": 115200,
                 "timeout": 1,
-                "ports": [
-                    '/dev/ttyUSB0',
-                    '/dev/ttyACM0',
-                    'COM3',
-                    'COM4',
-                    'COM5',
-                    'COM6',
-                    'COM7',
-                    'COM8'
-                ]
+                "ports": list(DEFAULT_ARDUINO_PORTS)
             },
             "image_processing": {
                 "max_file_size": 10485760,  # 10MB
@@ -203,170 +344,49 @@ class Config:
                 "default_threshold": 128,
                 "default_dither": True,
                 "default_invert": False
-            },
-            "gcode_sequences": {
-                "on_connect": [
-                    "M115; get machine status",
-                    "G91; set relative motion mode",
-                    "G21; set units to mm"
-                ],
-                "before_print": []
             }
         }
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value using dot notation (e.g., 'api.port')"""
-        keys = key.split('.')
-        value = self._config_data
-        
-        try:
-            for k in keys:
-                value = value[k]
-            return value
-        except (KeyError, TypeError):
-            return default
-    
-    @property
-    def api_title(self) -> str:
-        """Get API title"""
-        return self.get('api.title', 'PolarVortex API')
-    
-    @property
-    def api_version(self) -> str:
-        """Get API version"""
-        return self.get('api.version', '1.0.0')
-    
-    @property
-    def api_host(self) -> str:
-        """Get API host"""
-        return self.get('api.host', '0.0.0.0')
-    
-    @property
-    def api_port(self) -> int:
-        """Get API port"""
-        return self.get('api.port', 8000)
-    
-    @property
-    def cors_origins(self) -> List[str]:
-        """Get CORS origins"""
-        return self.get('cors.origins', [
-            "http://localhost:3000",
-            "http://127.0.0.1:3000",
-            "http://localhost:5173",
-            "http://127.0.0.1:5173"
-        ])
-    
-    @property
-    def arduino_baudrate(self) -> int:
-        """Get Arduino baudrate"""
-        return self.get('arduino.baudrate', 115200)
-    
-    @property
-    def arduino_timeout(self) -> int:
-        """Get Arduino timeout"""
-        return self.get('arduino.timeout', 1)
-    
-    @property
-    def arduino_ports(self) -> List[str]:
-        """Get Arduino ports"""
-        return self.get('arduino.ports', [
-            '/dev/ttyUSB0',
-            '/dev/ttyACM0',
-            'COM3',
-            'COM4',
-            'COM5',
-            'COM6',
-            'COM7',
-            'COM8'
-        ])
-    
-    @property
-    def max_file_size(self) -> int:
-        """Get maximum file size"""
-        return self.get('image_processing.max_file_size', 10485760)
-    
-    @property
-    def allowed_image_types(self) -> List[str]:
-        """Get allowed image types"""
-        return self.get('image_processing.allowed_types', [
-            'image/jpeg',
-            'image/jpg',
-            'image/png',
-            'image/gif',
-            'image/bmp',
-            'image/svg+xml',
-        ])
-    
-    @property
-    def resolution_presets(self) -> Dict[str, List[int]]:
-        """Get resolution presets"""
-        return self.get('image_processing.resolution_presets', {
-            "low": [400, 300],
-            "medium": [800, 600],
-            "high": [1200, 900],
-            "ultra": [1600, 1200]
-        })
-    
-    @property
-    def local_storage(self) -> str:
-        """Get local storage directory"""
-        return self.get('storage.local_storage', '/app/local_storage')
-    
-    @property
-    def project_storage(self) -> str:
-        """Get project storage directory"""
-        return self.get('storage.project_storage', '/app/local_storage/projects')
+        return self._flat.get(key, default)
     
-    @property
-    def processed_images_dir(self) -> str:
-        """Get processed images directory"""
-        return self.get('storage.processed_images_dir', 'processed_images')
-    
-    @property
-    def uploads_dir(self) -> str:
-        """Get uploads directory"""
-        return self.get('storage.uploads_dir', 'uploads')
-    
-    @property
-    def log_level(self) -> str:
-        """Get log level"""
-        return self.get('logging.level', 'INFO')
-    
-    @property
-    def log_format(self) -> str:
-        """Get log format"""
-        return self.get('logging.format', '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    
-    @property
-    def ws_ping_interval(self) -> int:
-        """Get WebSocket ping interval"""
-        return self.get('websocket.ping_interval', 30)
-    
-    @property
-    def ws_ping_timeout(self) -> int:
-        """Get WebSocket ping timeout"""
-        return self.get('websocket.ping_timeout', 10)
-    
-    @property
-    def default_threshold(self) -> int:
-        """Get default threshold"""
-        return self.get('plotting.default_threshold', 128)
-    
-    @property
-    def default_dither(self) -> bool:
-        """Get default dither setting"""
-        return self.get('plotting.default_dither', True)
-    
-    @property
-    def default_invert(self) -> bool:
-        """Get default invert setting"""
-        return self.get('plotting.default_invert', False)
+    def __getattr__(self, name: str) -> Any:
+        """Resolve a setting from _SCHEMA on first access and store it in its slot"""
+        try:
+            key = self._SCHEMA[name]
+        except KeyError:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}") from None
+        if key in self._flat:
+            value = self._flat[key]
+        else:
+            value = copy.deepcopy(_DEFAULT_SETTINGS[key])
+        setattr(self, name, value)
+        return value
     
     def to_dict(self) -> Dict[str, Any]:
         """Return the entire configuration as a dictionary"""
         return self._config_data.copy()
 
 
-# Create config instance
-config = Config()
+# Defaults of the _SCHEMA settings, indexed by dotted key
+_DEFAULT_SETTINGS: Final[Mapping[str, Any]] = MappingProxyType(Config._flatten(Config._get_default_config()))
+
+# Shared config instance, loaded on first use rather than at import
+_config: Optional[Config] = None
+
+
+def get_config() -> Config:
+    """Return the shared configuration, loading it on first call"""
+    global _config
+    if _config is None:
+        _config = Config()
+    return _config
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve the module-level ``config`` lazily (PEP 562)"""
+    if name == "config":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
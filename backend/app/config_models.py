@@ -1,13 +1,20 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 from enum import Enum
 
 
+# Response models are built once per request and never modified
+RESPONSE_MODEL_CONFIG = ConfigDict(frozen=True)
+
+
 class GcodeSettings(BaseModel):
     """Settings for automatic G-code sequences and pen control commands"""
-    on_connect: List[str] = Field(default_factory=list, description="Commands to run right after connecting to the plotter")
-    before_print: List[str] = Field(default_factory=list, description="Commands to run just before starting a print job")
+    # Nested in the shared, frozen response models, so immutable as well
+    model_config = RESPONSE_MODEL_CONFIG
+
+    on_connect: Tuple[str, ...] = Field(default=(), description="Commands to run right after connecting to the plotter")
+    before_print: Tuple[str, ...] = Field(default=(), description="Commands to run just before starting a print job")
     pen_up_command: str = Field(default="M280 P0 S110", description="Command to raise pen")
     pen_down_command: str = Field(default="M280 P0 S130", description="Command to lower pen")
     servo_delay_ms: float = Field(default=100.0, description="Delay in milliseconds after servo commands to allow settling (reduces bouncing)")
@@ -47,6 +54,28 @@ class PaperSize(str, Enum):
     LEGAL = "Legal"
     TABLOID = "Tabloid"
     CUSTOM = "Custom"
+    
+    def dimensions(self) -> Tuple[float, float]:
+        """Width and height in mm of a standard size; raises KeyError for CUSTOM"""
+        return PAPER_DIMENSIONS_MM[self]
+
+
+# Portrait width and height in mm of each standard paper size
+PAPER_DIMENSIONS_MM: Dict[PaperSize, Tuple[float, float]] = {
+    PaperSize.A5: (148.0, 210.0),
+    PaperSize.A4: (210.0, 297.0),
+    PaperSize.A3: (297.0, 420.0),
+    PaperSize.A2: (420.0, 594.0),
+    PaperSize.A1: (594.0, 841.0),
+    PaperSize.A0: (841.0, 1189.0),
+    PaperSize.A: (216.0, 279.0),
+    PaperSize.B: (279.0, 432.0),
+    PaperSize.C: (432.0, 559.0),
+    PaperSize.D: (559.0, 864.0),
+    PaperSize.LETTER: (216.0, 279.0),
+    PaperSize.LEGAL: (216.0, 356.0),
+    PaperSize.TABLOID: (279.0, 432.0),
+}
 
 
 class PlotterSettings(BaseModel):
@@ -146,6 +175,8 @@ class PaperUpdate(BaseModel):
 
 class PlotterResponse(BaseModel):
     """Response model for plotter configuration"""
+    model_config = RESPONSE_MODEL_CONFIG
+    
     id: str = Field(..., description="Unique identifier for the plotter")
     name: str = Field(..., description="Name of the plotter configuration")
     plotter_type: PlotterType = Field(..., description="Type of plotter")
@@ -168,6 +199,8 @@ class PlotterResponse(BaseModel):
 
 class PaperResponse(BaseModel):
     """Response model for paper configuration"""
+    model_config = RESPONSE_MODEL_CONFIG
+    
     id: str = Field(..., description="Unique identifier for the paper")
     name: str = Field(..., description="Name of the paper configuration")
     paper_size: PaperSize = Field(..., description="Standard paper size")
@@ -181,18 +214,24 @@ class PaperResponse(BaseModel):
 
 class PlotterListResponse(BaseModel):
     """Response model for listing plotters"""
+    model_config = RESPONSE_MODEL_CONFIG
+    
     plotters: List[PlotterResponse] = Field(..., description="List of plotter configurations")
     total: int = Field(..., description="Total number of plotters")
 
 
 class PaperListResponse(BaseModel):
     """Response model for listing papers"""
+    model_config = RESPONSE_MODEL_CONFIG
+    
     papers: List[PaperResponse] = Field(..., description="List of paper configurations")
     total: int = Field(..., description="Total number of papers")
 
 
 class ConfigurationResponse(BaseModel):
     """Response model for general configuration"""
+    model_config = RESPONSE_MODEL_CONFIG
+    
     plotters: List[PlotterResponse] = Field(..., description="List of plotter configurations")
     papers: List[PaperResponse] = Field(..., description="List of paper configurations")
     default_plotter: Optional[PlotterResponse] = Field(None, description="Default plotter configuration")
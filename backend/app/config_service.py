@@ -1,17 +1,154 @@
+import atexit
+import copy
+import functools
+import logging
 import os
+import shutil
+import tempfile
+import threading
 import yaml
 import json
 import uuid
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 from pathlib import Path
+from types import MappingProxyType
 from .config_models import (
     PlotterSettings, PaperSettings, PlotterCreate, PlotterUpdate,
     PaperCreate, PaperUpdate, PlotterResponse, PaperResponse,
     PlotterListResponse, PaperListResponse, ConfigurationResponse,
-    GcodeSettings, GcodeSettingsUpdate
+    GcodeSettings, GcodeSettingsUpdate, PaperSize
 )
-from .config import Config
+from .config import Config, config_cache_path, get_config, load_config_cache, save_config_cache
+
+# Prefer the libyaml-backed loader/dumper; fall back to the pure-Python ones
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+logger = logging.getLogger(__name__)
+
+# Timestamps are stored as ISO strings and many entries share one (defaults are
+# created together), so each distinct string is parsed only once
+_parse_timestamp = functools.lru_cache(maxsize=1024)(datetime.fromisoformat)
+
+# Mutations arriving within this window are written to disk together
+SAVE_DELAY_SECONDS = 0.1
+
+# A failed deferred save is retried after this long
+SAVE_RETRY_SECONDS = 5.0
+
+# Standard papers created in a new configuration, in display order
+DEFAULT_PAPER_NAMES = (
+    # European A series
+    (PaperSize.A5, "A5 Paper (148×210mm)"),
+    (PaperSize.A4, "A4 Paper (210×297mm)"),
+    (PaperSize.A3, "A3 Paper (297×420mm)"),
+    (PaperSize.A2, "A2 Paper (420×594mm)"),
+    (PaperSize.A1, "A1 Paper (594×841mm)"),
+    (PaperSize.A0, "A0 Paper (841×1189mm)"),
+    # US paper sizes
+    (PaperSize.A, "US A (8.50x11.00 in)"),
+    (PaperSize.B, "US B Size (11.0x17.0 in)"),
+    (PaperSize.C, "US C Size (17.0x22.0 in)"),
+    (PaperSize.D, "US D Size (22.0x34.0 in)"),
+    (PaperSize.LETTER, "Letter Size (8.50x11.00 in)"),
+    (PaperSize.LEGAL, "Legal Size (8.50x14.0 in)"),
+    (PaperSize.TABLOID, "Tabloid Size (11.0x17.0 in)"),
+)
+
+# (name, paper_size, width, height, is_default) of each standard paper
+DEFAULT_PAPERS = tuple(
+    (name, paper_size.value, *paper_size.dimensions(), paper_size is PaperSize.A4)
+    for paper_size, name in DEFAULT_PAPER_NAMES
+)
+
+# Required fields of stored plotters and papers, with the values filled in when
+# missing; ids and G-code sequences are generated per entry
+PLOTTER_FIELD_DEFAULTS = MappingProxyType({
+    'id': None,
+    'name': 'Unknown',
+    'plotter_type': 'polargraph',
+    'width': 0.0,
+    'height': 0.0,
+    'mm_per_rev': 0.0,
+    'steps_per_rev': 0.0,
+    'gcode_sequences': None,
+})
+
+PAPER_FIELD_DEFAULTS = MappingProxyType({
+    'id': None,
+    'name': 'Unknown',
+    'paper_size': 'A4',
+    'width': 0.0,
+    'height': 0.0,
+    'color': 'white',
+})
+
+# Legacy PlotterUpdate fields folded into gcode_sequences instead of stored
+PLOTTER_PEN_OVERRIDE_FIELDS = frozenset({"gcode_pen_up_command", "gcode_pen_down_command"})
+
+# Conversions from update model values to their stored form, by field
+PLOTTER_UPDATE_CONVERTERS = MappingProxyType({
+    "plotter_type": lambda value: value.value,
+    # Only the fields the caller sent, like the exclude_unset dump this replaced
+    "gcode_sequences": lambda value: value.model_dump(mode="json", exclude_unset=True) if isinstance(value, GcodeSettings) else value,
+})
+
+PAPER_UPDATE_CONVERTERS = MappingProxyType({
+    "paper_size": lambda value: value.value,
+})
+
+# Automatic G-code for new plotters; copy before modifying
+DEFAULT_GCODE_SEQUENCES = MappingProxyType({
+    "on_connect": (
+        "M115; get machine status",
+        "G91; set relative motion mode",
+        "G21; set units to mm",
+    ),
+    "before_print": (
+        "G92 X0 Y0 Z0; set home position",
+    ),
+    "pen_up_command": "M280 P0 S110",
+    "pen_down_command": "M280 P0 S130",
+    "servo_delay_ms": 100.0,
+})
+
+# File change notifications (inotify/kqueue/...) are optional; without them
+# the configuration file is stat'ed on every access instead
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+
+def _bulk_uuids(count: int) -> List[str]:
+    """Random (version 4) UUID strings, drawing the randomness in one urandom call"""
+    raw = os.urandom(16 * count)
+    return [str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, 16 * count, 16)]
+
+
+class _ConfigFileHandler(FileSystemEventHandler):
+    """Flags the service's configuration file as changed on any event touching it"""
+    
+    def __init__(self, service: "ConfigurationService"):
+        super().__init__()
+        self.service = service
+        # Where the configuration path points; a symlink swap (e.g. a mounted
+        # Kubernetes ConfigMap replacing its ..data link) changes it without
+        # any event naming the configuration file itself
+        self._target = os.path.realpath(service.config_file_path)
+    
+    def on_any_event(self, event):
+        config_path = str(self.service.config_file_path)
+        target = os.path.realpath(config_path)
+        event_paths = (event.src_path, getattr(event, "dest_path", None))
+        if target != self._target or config_path in event_paths or target in event_paths:
+            self._target = target
+            self.service._config_changed.set()
 
 
 class ConfigurationService:
@@ -19,11 +156,65 @@ class ConfigurationService:
     
     def __init__(self):
         """Initialize the configuration service"""
-        self.config = Config()
         self.config_file_path = self._get_config_file_path()
         self._config_mtime = None
+        self._dirty = False
+        # Copy of config_data taken when it last changed, waiting to be written
+        self._pending_save: Optional[Dict[str, Any]] = None
+        self._save_timer: Optional[threading.Timer] = None
+        # Guards the three fields above; held only briefly, never during I/O
+        self._save_lock = threading.Lock()
+        # Serializes the file writes so snapshots reach the disk in order
+        self._write_lock = threading.Lock()
+        # Responses built from the current config_data, keyed by id
+        self._plotter_resp_cache: Dict[str, Tuple[str, PlotterResponse]] = {}
+        self._paper_resp_cache: Dict[str, Tuple[str, PaperResponse]] = {}
+        # Looked up on every G-code analysis; cleared with the caches above
+        self._default_plotter_resp: Optional[PlotterResponse] = None
         self._ensure_config_directory()
-        self._load_configurations()
+        self._config_changed = threading.Event()
+        # The watcher starts with the first load of config_data
+        self._observer: Optional["Observer"] = None
+        self._watched_path: Optional[Path] = None
+        self._plotter_idx: Dict[str, int] = {}
+        self._paper_idx: Dict[str, int] = {}
+        # Loaded on first access, so processes that never read it skip the parse
+        self._config_data: Optional[Dict[str, Any]] = None
+        atexit.register(self.close)
+    
+    @property
+    def config(self) -> Config:
+        """The application configuration, loaded on first use"""
+        return get_config()
+    
+    @property
+    def config_data(self) -> Dict[str, Any]:
+        """The configuration, loaded from the YAML file on first access"""
+        if self._config_data is None:
+            if self._observer is None:
+                # Watch before reading, so no change after the read is missed
+                self._watched_path = self._watch_config_file()
+            self._load_configurations()
+        return self._config_data
+    
+    @config_data.setter
+    def config_data(self, value: Dict[str, Any]):
+        self._config_data = value
+        self._clear_response_caches()
+    
+    def close(self):
+        """Stop watching the configuration file and write out any pending changes"""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+            # Without the watcher, fall back to stat'ing the file on access
+            self._watched_path = None
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+        self._flush()
     
     def _get_config_file_path(self) -> Path:
         """Get the path to the configuration file"""
@@ -38,16 +229,29 @@ class ConfigurationService:
     
     def _load_configurations(self):
         """Load configurations from the YAML file"""
+        self._clear_response_caches()
         if not self.config_file_path.exists():
             self._create_default_config_file()
         
+        # Reuse the parse cached next to the YAML file while its stat is unchanged
+        cached = load_config_cache(config_cache_path(self.config_file_path))
         try:
-            with open(self.config_file_path, 'r', encoding='utf-8') as file:
-                self.config_data = yaml.safe_load(file) or {}
-        except yaml.YAMLError as e:
-            raise ValueError(f"Invalid YAML configuration file: {e}")
-        except Exception as e:
-            raise RuntimeError(f"Error loading configuration file: {e}")
+            yaml_stat = self.config_file_path.stat()
+            stamp = (yaml_stat.st_mtime_ns, yaml_stat.st_size)
+        except OSError:
+            stamp = None
+        if stamp is not None and cached.get("stamp") == stamp:
+            self.config_data = cached["data"]
+        else:
+            try:
+                # libyaml scans UTF-8 bytes itself; skip decoding to str first
+                self.config_data = yaml.load(self.config_file_path.read_bytes(), Loader=SafeLoader) or {}
+            except yaml.YAMLError as e:
+                raise ValueError(f"Invalid YAML configuration file: {e}")
+            except Exception as e:
+                raise RuntimeError(f"Error loading configuration file: {e}")
+            if stamp is not None:
+                save_config_cache(config_cache_path(self.config_file_path), {"stamp": stamp, "data": self.config_data})
 
         if self.config_file_path.exists():
             self._config_mtime = self.config_file_path.stat().st_mtime
@@ -67,32 +271,54 @@ class ConfigurationService:
         
         # Ensure other essential sections exist
         essential_sections = ['api', 'cors', 'arduino', 'image_processing', 'storage', 'logging', 'websocket', 'plotting']
-        for section in essential_sections:
-            if section not in self.config_data:
-                default_config = self._get_default_config()
+        missing_sections = [section for section in essential_sections if section not in self.config_data]
+        if missing_sections:
+            # Build the defaults once, not once per missing section
+            default_config = self._get_default_config()
+            for section in missing_sections:
                 self.config_data[section] = default_config[section]
-                needs_update = True
+            needs_update = True
 
         # Remove legacy top-level gcode_sequences (now per-plotter)
         if 'gcode_sequences' in self.config_data:
             self.config_data.pop('gcode_sequences', None)
             needs_update = True
 
-        # Save updated configuration if needed
-        if needs_update:
-            self._save_configurations()
-        
-        # Validate and repair configuration if needed
-        self._validate_and_repair_config()
+        # Validate and repair configuration, then save once if anything changed
+        if self._validate_and_repair_config() or needs_update:
+            self._mark_dirty()
+
+    def _watch_config_file(self) -> Optional[Path]:
+        """Start watching the configuration file for changes; returns the watched path"""
+        if Observer is None:
+            return None
+        try:
+            observer = Observer()
+            observer.daemon = True
+            observer.schedule(_ConfigFileHandler(self), str(self.config_file_path.parent), recursive=False)
+            observer.start()
+        except Exception:
+            # E.g. inotify watch limit reached; fall back to stat'ing on access
+            return None
+        self._observer = observer
+        return self.config_file_path
 
     def _refresh_if_changed(self):
         """Reload configuration from disk if updated elsewhere."""
+        if self._dirty:
+            # In-memory changes not yet written out take precedence
+            return
+        if self._watched_path == self.config_file_path and not self._config_changed.is_set():
+            # The watcher has seen no change to the file since the last check
+            return
+        self._config_changed.clear()
         try:
             if not self.config_file_path.exists():
                 self._load_configurations()
                 return
+            # Any difference counts: a file swapped in behind a symlink may be older
             current_mtime = self.config_file_path.stat().st_mtime
-            if self._config_mtime is None or current_mtime > self._config_mtime:
+            if self._config_mtime is None or current_mtime != self._config_mtime:
                 self._load_configurations()
         except Exception:
             # Best-effort refresh; keep current config_data on errors.
@@ -104,7 +330,7 @@ class ConfigurationService:
         
         try:
             with open(self.config_file_path, 'w', encoding='utf-8') as file:
-                yaml.dump(default_config, file, default_flow_style=False, indent=2, sort_keys=False)
+                yaml.dump(default_config, file, Dumper=SafeDumper, default_flow_style=False, indent=2, sort_keys=False)
             
             self.config_data = default_config
         except Exception as e:
@@ -112,76 +338,14 @@ class ConfigurationService:
     
     def _get_default_config(self) -> Dict[str, Any]:
         """Get default configuration with plotters and papers."""
-        return {
-            "api": {
-                "title": "PolarVortex API",
-                "version": "1.0.0",
-                "host": "0.0.0.0",
-                "port": 8000
-            },
-            "cors": {
-                "origins": [
-                    "http://localhost:3000",
-                    "http://127.0.0.1:3000",
-                    "http://localhost:5173",
-                    "http://127.0.0.1:5173"
-                ]
-            },
-            "arduino": {
-                "baudrate": 115200,
-                "timeout": 1,
-                "ports": [
-                    '/dev/ttyUSB0',
-                    '/dev/ttyACM0',
-                    'COM3',
-                    'COM4',
-                    'COM5',
-                    'COM6',
-                    'COM7',
-                    'COM8'
-                ]
-            },
-            "image_processing": {
-                "max_file_size": 10485760,
-                "allowed_types": [
-                    'image/jpeg',
-                    'image/jpg',
-                    'image/png',
-                    'image/gif',
-                    'image/bmp'
-                ],
-                "resolution_presets": {
-                    "low": [400, 300],
-                    "medium": [800, 600],
-                    "high": [1200, 900],
-                    "ultra": [1600, 1200]
-                }
-            },
-            "storage": {
-                "local_storage": "/app/local_storage",
-                "project_storage": "/app/local_storage/projects",
-                "processed_images_dir": "processed_images",
-                "uploads_dir": "uploads"
-            },
-            "logging": {
-                "level": "INFO",
-                "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-            },
-            "websocket": {
-                "ping_interval": 30,
-                "ping_timeout": 10
-            },
-            "plotting": {
-                "default_threshold": 128,
-                "default_dither": True,
-                "default_invert": False
-            },
-            "plotters": self._get_default_plotters(),
-            "papers": self._get_default_papers()
-        }
+        default_config = Config._get_default_config()
+        default_config["plotters"] = self._get_default_plotters()
+        default_config["papers"] = self._get_default_papers()
+        return default_config
     
     def _get_default_plotters(self) -> List[Dict[str, Any]]:
         """Get default plotter configurations"""
+        now_iso = datetime.now().isoformat()
         return [
             {
                 "id": str(uuid.uuid4()),
@@ -200,179 +364,39 @@ class ConfigurationService:
                 "home_position_x": 0.0,
                 "home_position_y": 0.0,
                 "is_default": True,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
+                "created_at": now_iso,
+                "updated_at": now_iso
             }
         ]
     
     def _get_default_papers(self) -> List[Dict[str, Any]]:
         """Get default paper configurations"""
+        now_iso = datetime.now().isoformat()
         return [
-            # European A series
-            {
-                "id": str(uuid.uuid4()),
-                "name": "A5 Paper (148×210mm)",
-                "paper_size": "A5",
-                "width": 148.0,
-                "height": 210.0,
-                "color": "white",
-                "is_default": False,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "A4 Paper (210×297mm)",
-                "paper_size": "A4",
-                "width": 210.0,
-                "height": 297.0,
-                "color": "white",
-                "is_default": True,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "A3 Paper (297×420mm)",
-                "paper_size": "A3",
-                "width": 297.0,
-                "height": 420.0,
-                "color": "white",
-                "is_default": False,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "A2 Paper (420×594mm)",
-                "paper_size": "A2",
-                "width": 420.0,
-                "height": 594.0,
-                "color": "white",
-                "is_default": False,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "A1 Paper (594×841mm)",
-                "paper_size": "A1",
-                "width": 594.0,
-                "height": 841.0,
-                "color": "white",
-                "is_default": False,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "A0 Paper (841×1189mm)",
-                "paper_size": "A0",
-                "width": 841.0,
-                "height": 1189.0,
-                "color": "white",
-                "is_default": False,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
-            },
-            # US paper sizes
-            {
-                "id": str(uuid.uuid4()),
-                "name": "US A (8.50x11.00 in)",
-                "paper_size": "A",
-                "width": 216.0,
-                "height": 279.0,
-                "color": "white",
-                "is_default": False,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "US B Size (11.0x17.0 in)",
-                "paper_size": "B",
-                "width": 279.0,
-                "height": 432.0,
-                "color": "white",
-                "is_default": False,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "US C Size (17.0x22.0 in)",
-                "paper_size": "C",
-                "width": 432.0,
-                "height": 559.0,
-                "color": "white",
-                "is_default": False,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "US D Size (22.0x34.0 in)",
-                "paper_size": "D",
-                "width": 559.0,
-                "height": 864.0,
-                "color": "white",
-                "is_default": False,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
-            },
             {
-                "id": str(uuid.uuid4()),
-                "name": "Letter Size (8.50x11.00 in)",
-                "paper_size": "Letter",
-                "width": 216.0,
-                "height": 279.0,
+                "id": paper_id,
+                "name": name,
+                "paper_size": paper_size,
+                "width": width,
+                "height": height,
                 "color": "white",
-                "is_default": False,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Legal Size (8.50x14.0 in)",
-                "paper_size": "Legal",
-                "width": 216.0,
-                "height": 356.0,
-                "color": "white",
-                "is_default": False,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Tabloid Size (11.0x17.0 in)",
-                "paper_size": "Tabloid",
-                "width": 279.0,
-                "height": 432.0,
-                "color": "white",
-                "is_default": False,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
+                "is_default": is_default,
+                "created_at": now_iso,
+                "updated_at": now_iso
             }
+            for paper_id, (name, paper_size, width, height, is_default)
+            in zip(_bulk_uuids(len(DEFAULT_PAPERS)), DEFAULT_PAPERS)
         ]
 
     def _get_default_gcode_sequences(self) -> Dict[str, Any]:
         """Get default G-code sequences for automation"""
         return {
-            "on_connect": [
-                "M115; get machine status",
-                "G91; set relative motion mode",
-                "G21; set units to mm"
-            ],
-            "before_print": [
-                "G92 X0 Y0 Z0; set home position"
-            ],
-            "pen_up_command": "M280 P0 S110",
-            "pen_down_command": "M280 P0 S130",
-            "servo_delay_ms": 100.0,
+            key: list(value) if isinstance(value, tuple) else value
+            for key, value in DEFAULT_GCODE_SEQUENCES.items()
         }
     
-    def _validate_and_repair_config(self):
-        """Validate and repair configuration to ensure all required fields exist"""
+    def _validate_and_repair_config(self) -> bool:
+        """Validate and repair configuration to ensure all required fields exist; returns whether anything changed"""
         needs_repair = False
         
         # Check if we have at least one default plotter
@@ -389,14 +413,7 @@ class ConfigurationService:
         
         # Enforce a single default plotter if multiple are set
         if len(default_plotters) > 1:
-            def _plotter_updated_at(plotter: Dict[str, Any]) -> float:
-                updated_at = plotter.get('updated_at') or plotter.get('created_at')
-                try:
-                    return datetime.fromisoformat(updated_at).timestamp()
-                except Exception:
-                    return 0.0
-
-            latest_default = max(default_plotters, key=_plotter_updated_at)
+            latest_default = self._latest_default_plotter(default_plotters)
             for plotter in self.config_data.get('plotters', []):
                 plotter['is_default'] = plotter['id'] == latest_default.get('id')
             needs_repair = True
@@ -413,54 +430,119 @@ class ConfigurationService:
                 self.config_data['papers'] = self._get_default_papers()
                 needs_repair = True
         
-        # Ensure all plotters have required fields
-        for plotter in self.config_data.get('plotters', []):
-            required_fields = [
-                'id', 'name', 'plotter_type', 'width', 'height',
-                'mm_per_rev', 'steps_per_rev', 'gcode_sequences'
-            ]
-            for field in required_fields:
-                if field not in plotter:
+        # Ensure all plotters and papers have required fields
+        for section, field_defaults in (('plotters', PLOTTER_FIELD_DEFAULTS), ('papers', PAPER_FIELD_DEFAULTS)):
+            for item in self.config_data.get(section, []):
+                missing = field_defaults.keys() - item.keys()
+                if not missing:
+                    continue
+                # Walk the defaults rather than the set to keep the written key order stable
+                for field in field_defaults:
+                    if field not in missing:
+                        continue
                     if field == 'id':
-                        plotter[field] = str(uuid.uuid4())
-                    elif field in ['width', 'height', 'mm_per_rev', 'steps_per_rev']:
-                        plotter[field] = 0.0
+                        item[field] = str(uuid.uuid4())
                     elif field == 'gcode_sequences':
-                        plotter[field] = self._get_default_gcode_sequences()
-                    elif field == 'plotter_type':
-                        plotter[field] = 'polargraph'
+                        item[field] = self._get_default_gcode_sequences()
                     else:
-                        plotter[field] = 'Unknown'
-                    needs_repair = True
-        
-        # Ensure all papers have required fields
-        for paper in self.config_data.get('papers', []):
-            required_fields = ['id', 'name', 'paper_size', 'width', 'height', 'color']
-            for field in required_fields:
-                if field not in paper:
-                    if field == 'id':
-                        paper[field] = str(uuid.uuid4())
-                    elif field in ['width', 'height']:
-                        paper[field] = 0.0
-                    elif field == 'paper_size':
-                        paper[field] = 'A4'
-                    elif field == 'color':
-                        paper[field] = 'white'
-                    else:
-                        paper[field] = 'Unknown'
-                    needs_repair = True
+                        item[field] = field_defaults[field]
+                needs_repair = True
         
-        # Save repaired configuration if needed
-        if needs_repair:
-            self._save_configurations()
+        self._rebuild_indexes()
+        return needs_repair
+    
+    def _rebuild_indexes(self):
+        """Rebuild the id -> list position lookups for plotters and papers"""
+        self._plotter_idx = {p['id']: i for i, p in enumerate(self.config_data.get('plotters', []))}
+        self._paper_idx = {p['id']: i for i, p in enumerate(self.config_data.get('papers', []))}
+    
+    def _find_plotter(self, plotter_id: str) -> Optional[Dict[str, Any]]:
+        """Get a plotter dictionary by ID"""
+        i = self._index_of('plotters', plotter_id)
+        return None if i is None else self.config_data['plotters'][i]
+    
+    def _find_paper(self, paper_id: str) -> Optional[Dict[str, Any]]:
+        """Get a paper dictionary by ID"""
+        i = self._index_of('papers', paper_id)
+        return None if i is None else self.config_data['papers'][i]
+    
+    def _index_of(self, section: str, item_id: str) -> Optional[int]:
+        """Get the list position of a plotter or paper by ID"""
+        items = self.config_data.get(section, [])
+        i = (self._plotter_idx if section == 'plotters' else self._paper_idx).get(item_id)
+        if i is None or i >= len(items) or items[i].get('id') != item_id:
+            # config_data may have been replaced or edited without the index
+            self._rebuild_indexes()
+            i = (self._plotter_idx if section == 'plotters' else self._paper_idx).get(item_id)
+        return i
+    
+    def _mark_dirty(self):
+        """Schedule a save, coalescing changes made in quick succession into one write"""
+        self._clear_response_caches()
+        # Copied here, once the mutation is complete, so the timer thread
+        # never serializes a half-applied change
+        snapshot = copy.deepcopy(self.config_data)
+        with self._save_lock:
+            self._pending_save = snapshot
+            self._dirty = True
+            self._schedule_save(SAVE_DELAY_SECONDS)
+    
+    def _schedule_save(self, delay: float):
+        """Start the save timer unless one is already running; call with _save_lock held"""
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(delay, self._flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
     
-    def _save_configurations(self):
-        """Save configurations to the YAML file"""
+    def _flush(self):
+        """Save configurations if changes are pending"""
+        with self._write_lock:
+            with self._save_lock:
+                self._save_timer = None
+                snapshot = self._pending_save
+                self._pending_save = None
+            if snapshot is None:
+                return
+            try:
+                self._save_configurations(snapshot)
+            except Exception as e:
+                # Keep the changes pending, unless newer ones replaced them, and retry
+                with self._save_lock:
+                    if self._pending_save is None:
+                        self._pending_save = snapshot
+                    self._schedule_save(SAVE_RETRY_SECONDS)
+                logger.error(f"Deferred configuration save failed, retrying in {SAVE_RETRY_SECONDS:g}s: {e}")
+                return
+            with self._save_lock:
+                if self._pending_save is None:
+                    self._dirty = False
+    
+    def _save_configurations(self, data: Optional[Dict[str, Any]] = None):
+        """Save configurations (config_data unless ``data`` is given) to the YAML file"""
+        if data is None:
+            data = self.config_data
         try:
-            with open(self.config_file_path, 'w', encoding='utf-8') as file:
-                yaml.dump(self.config_data, file, default_flow_style=False, indent=2, sort_keys=False)
+            # Write a sibling temp file and swap it in, so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.config_file_path.parent, prefix=self.config_file_path.name, suffix='.tmp'
+            )
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                    yaml.dump(data, file, Dumper=SafeDumper, default_flow_style=False, indent=2, sort_keys=False)
+                    file.flush()
+                    os.fsync(file.fileno())
+                if self.config_file_path.exists():
+                    # mkstemp creates the file owner-only; keep the existing permissions
+                    shutil.copymode(self.config_file_path, tmp_path)
+                os.replace(tmp_path, self.config_file_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
             if self.config_file_path.exists():
-                self._config_mtime = self.config_file_path.stat().st_mtime
+                yaml_stat = self.config_file_path.stat()
+                self._config_mtime = yaml_stat.st_mtime
+                stamp = (yaml_stat.st_mtime_ns, yaml_stat.st_size)
+                save_config_cache(config_cache_path(self.config_file_path), {"stamp": stamp, "data": data})
         except Exception as e:
             raise RuntimeError(f"Error saving configuration file: {e}")
     
@@ -468,7 +550,7 @@ class ConfigurationService:
     def create_plotter(self, plotter_data: PlotterCreate) -> PlotterResponse:
         """Create a new plotter configuration"""
         plotter_id = str(uuid.uuid4())
-        now = datetime.now()
+        now_iso = datetime.now().isoformat()
         
         # If this is set as default, unset other defaults
         if plotter_data.is_default:
@@ -476,9 +558,9 @@ class ConfigurationService:
                 plotter['is_default'] = False
         
         gcode_sequences = (
-            plotter_data.gcode_sequences.dict()
+            plotter_data.gcode_sequences.model_dump(mode="json")
             if plotter_data.gcode_sequences is not None
-            else GcodeSettings().dict()
+            else GcodeSettings().model_dump(mode="json")
         )
         if plotter_data.gcode_pen_up_command is not None:
             gcode_sequences["pen_up_command"] = plotter_data.gcode_pen_up_command
@@ -502,22 +584,23 @@ class ConfigurationService:
             "home_position_x": plotter_data.home_position_x,
             "home_position_y": plotter_data.home_position_y,
             "is_default": plotter_data.is_default,
-            "created_at": now.isoformat(),
-            "updated_at": now.isoformat()
+            "created_at": now_iso,
+            "updated_at": now_iso
         }
         
         self.config_data['plotters'].append(plotter_dict)
-        self._save_configurations()
+        self._plotter_idx[plotter_id] = len(self.config_data['plotters']) - 1
+        self._mark_dirty()
         
         return self._dict_to_plotter_response(plotter_dict)
     
     def get_plotter(self, plotter_id: str) -> Optional[PlotterResponse]:
         """Get a plotter configuration by ID"""
         self._refresh_if_changed()
-        for plotter in self.config_data['plotters']:
-            if plotter['id'] == plotter_id:
-                return self._dict_to_plotter_response(plotter)
-        return None
+        plotter = self._find_plotter(plotter_id)
+        if plotter is None:
+            return None
+        return self._dict_to_plotter_response(plotter)
     
     def list_plotters(self) -> PlotterListResponse:
         """List all plotter configurations"""
@@ -527,74 +610,79 @@ class ConfigurationService:
     
     def update_plotter(self, plotter_id: str, plotter_data: PlotterUpdate) -> Optional[PlotterResponse]:
         """Update a plotter configuration"""
-        for i, plotter in enumerate(self.config_data['plotters']):
-            if plotter['id'] == plotter_id:
-                # If this is set as default, unset other defaults
-                if plotter_data.is_default is True:
-                    for other_plotter in self.config_data['plotters']:
-                        if other_plotter['id'] != plotter_id:
-                            other_plotter['is_default'] = False
-                
-                # Update fields that are provided
-                update_data = plotter_data.dict(exclude_unset=True)
-                pen_up_override = update_data.pop("gcode_pen_up_command", None)
-                pen_down_override = update_data.pop("gcode_pen_down_command", None)
-                if pen_up_override is not None or pen_down_override is not None:
-                    existing_sequences = plotter.get('gcode_sequences', self._get_default_gcode_sequences())
-                    if pen_up_override is not None:
-                        existing_sequences['pen_up_command'] = pen_up_override
-                    if pen_down_override is not None:
-                        existing_sequences['pen_down_command'] = pen_down_override
-                    update_data['gcode_sequences'] = existing_sequences
-                for key, value in update_data.items():
-                    if key == 'plotter_type':
-                        plotter[key] = value.value
-                    elif key == 'gcode_sequences' and value is not None:
-                        if isinstance(value, dict):
-                            plotter[key] = value
-                        else:
-                            plotter[key] = value.dict()
-                    else:
-                        plotter[key] = value
-                
-                plotter['updated_at'] = datetime.now().isoformat()
-                self._save_configurations()
-                return self._dict_to_plotter_response(plotter)
-        return None
+        plotter = self._find_plotter(plotter_id)
+        if plotter is None:
+            return None
+        
+        # If this is set as default, unset other defaults
+        if plotter_data.is_default is True:
+            for other_plotter in self.config_data['plotters']:
+                if other_plotter['id'] != plotter_id:
+                    other_plotter['is_default'] = False
+        
+        # Update fields that are provided
+        update_data = {
+            key: getattr(plotter_data, key)
+            for key in plotter_data.model_fields_set - PLOTTER_PEN_OVERRIDE_FIELDS
+        }
+        pen_up_override = plotter_data.gcode_pen_up_command
+        pen_down_override = plotter_data.gcode_pen_down_command
+        if pen_up_override is not None or pen_down_override is not None:
+            existing_sequences = plotter.get('gcode_sequences', self._get_default_gcode_sequences())
+            if pen_up_override is not None:
+                existing_sequences['pen_up_command'] = pen_up_override
+            if pen_down_override is not None:
+                existing_sequences['pen_down_command'] = pen_down_override
+            update_data['gcode_sequences'] = existing_sequences
+        for key, value in update_data.items():
+            convert = PLOTTER_UPDATE_CONVERTERS.get(key)
+            plotter[key] = convert(value) if convert is not None else value
+        
+        plotter['updated_at'] = datetime.now().isoformat()
+        self._mark_dirty()
+        return self._dict_to_plotter_response(plotter)
     
     def delete_plotter(self, plotter_id: str) -> bool:
         """Delete a plotter configuration"""
-        for i, plotter in enumerate(self.config_data['plotters']):
-            if plotter['id'] == plotter_id:
-                del self.config_data['plotters'][i]
-                self._save_configurations()
-                return True
-        return False
+        i = self._index_of('plotters', plotter_id)
+        if i is None:
+            return False
+        del self.config_data['plotters'][i]
+        self._rebuild_indexes()
+        self._mark_dirty()
+        return True
     
     def get_default_plotter(self) -> Optional[PlotterResponse]:
         """Get the default plotter configuration"""
         self._refresh_if_changed()
-        default_plotters = [p for p in self.config_data['plotters'] if p.get('is_default', False)]
-        if default_plotters:
-            if len(default_plotters) == 1:
-                return self._dict_to_plotter_response(default_plotters[0])
-
-            def _plotter_updated_at(plotter: Dict[str, Any]) -> float:
-                updated_at = plotter.get('updated_at') or plotter.get('created_at')
-                try:
-                    return datetime.fromisoformat(updated_at).timestamp()
-                except Exception:
-                    return 0.0
-
-            latest_default = max(default_plotters, key=_plotter_updated_at)
-            return self._dict_to_plotter_response(latest_default)
-        return None
+        if self._default_plotter_resp is None:
+            default_plotters = [p for p in self.config_data['plotters'] if p.get('is_default', False)]
+            latest_default = self._latest_default_plotter(default_plotters)
+            if latest_default is None:
+                return None
+            self._default_plotter_resp = self._dict_to_plotter_response(latest_default)
+        return self._default_plotter_resp
+    
+    @staticmethod
+    def _latest_default_plotter(default_plotters: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Pick the most recently updated of the plotters flagged as default"""
+        if len(default_plotters) <= 1:
+            return default_plotters[0] if default_plotters else None
+
+        def _plotter_updated_at(plotter: Dict[str, Any]) -> float:
+            updated_at = plotter.get('updated_at') or plotter.get('created_at')
+            try:
+                return _parse_timestamp(updated_at).timestamp()
+            except Exception:
+                return 0.0
+
+        return max(default_plotters, key=_plotter_updated_at)
     
     # Paper management methods
     def create_paper(self, paper_data: PaperCreate) -> PaperResponse:
         """Create a new paper configuration"""
         paper_id = str(uuid.uuid4())
-        now = datetime.now()
+        now_iso = datetime.now().isoformat()
         
         # If this is set as default, unset other defaults
         if paper_data.is_default:
@@ -609,21 +697,22 @@ class ConfigurationService:
             "height": paper_data.height,
             "color": paper_data.color,
             "is_default": paper_data.is_default,
-            "created_at": now.isoformat(),
-            "updated_at": now.isoformat()
+            "created_at": now_iso,
+            "updated_at": now_iso
         }
         
         self.config_data['papers'].append(paper_dict)
-        self._save_configurations()
+        self._paper_idx[paper_id] = len(self.config_data['papers']) - 1
+        self._mark_dirty()
         
         return self._dict_to_paper_response(paper_dict)
     
     def get_paper(self, paper_id: str) -> Optional[PaperResponse]:
         """Get a paper configuration by ID"""
-        for paper in self.config_data['papers']:
-            if paper['id'] == paper_id:
-                return self._dict_to_paper_response(paper)
-        return None
+        paper = self._find_paper(paper_id)
+        if paper is None:
+            return None
+        return self._dict_to_paper_response(paper)
     
     def list_papers(self) -> PaperListResponse:
         """List all paper configurations"""
@@ -632,35 +721,35 @@ class ConfigurationService:
     
     def update_paper(self, paper_id: str, paper_data: PaperUpdate) -> Optional[PaperResponse]:
         """Update a paper configuration"""
-        for i, paper in enumerate(self.config_data['papers']):
-            if paper['id'] == paper_id:
-                # If this is set as default, unset other defaults
-                if paper_data.is_default is True:
-                    for other_paper in self.config_data['papers']:
-                        if other_paper['id'] != paper_id:
-                            other_paper['is_default'] = False
-                
-                # Update fields that are provided
-                update_data = paper_data.dict(exclude_unset=True)
-                for key, value in update_data.items():
-                    if key == 'paper_size':
-                        paper[key] = value.value
-                    else:
-                        paper[key] = value
-                
-                paper['updated_at'] = datetime.now().isoformat()
-                self._save_configurations()
-                return self._dict_to_paper_response(paper)
-        return None
+        paper = self._find_paper(paper_id)
+        if paper is None:
+            return None
+        
+        # If this is set as default, unset other defaults
+        if paper_data.is_default is True:
+            for other_paper in self.config_data['papers']:
+                if other_paper['id'] != paper_id:
+                    other_paper['is_default'] = False
+        
+        # Update fields that are provided
+        for key in paper_data.model_fields_set:
+            value = getattr(paper_data, key)
+            convert = PAPER_UPDATE_CONVERTERS.get(key)
+            paper[key] = convert(value) if convert is not None else value
+        
+        paper['updated_at'] = datetime.now().isoformat()
+        self._mark_dirty()
+        return self._dict_to_paper_response(paper)
     
     def delete_paper(self, paper_id: str) -> bool:
         """Delete a paper configuration"""
-        for i, paper in enumerate(self.config_data['papers']):
-            if paper['id'] == paper_id:
-                del self.config_data['papers'][i]
-                self._save_configurations()
-                return True
-        return False
+        i = self._index_of('papers', paper_id)
+        if i is None:
+            return False
+        del self.config_data['papers'][i]
+        self._rebuild_indexes()
+        self._mark_dirty()
+        return True
     
     def get_default_paper(self) -> Optional[PaperResponse]:
         """Get the default paper configuration"""
@@ -680,7 +769,7 @@ class ConfigurationService:
         if default_plotter:
             return default_plotter.gcode_sequences
         # Fallback: ensure we always return a model
-        defaults = self._get_default_gcode_sequences()
+        defaults = DEFAULT_GCODE_SEQUENCES
         return GcodeSettings(
             on_connect=defaults.get("on_connect", []),
             before_print=defaults.get("before_print", []),
@@ -698,6 +787,7 @@ class ConfigurationService:
         if not target_id:
             # No plotters present; seed defaults
             self.config_data["plotters"] = self._get_default_plotters()
+            self._rebuild_indexes()
             target_id = self.config_data["plotters"][0]["id"]
 
         updated = self.update_plotter_gcode_settings(target_id, gcode_data)
@@ -709,22 +799,48 @@ class ConfigurationService:
     def get_all_configurations(self) -> ConfigurationResponse:
         """Get all configurations (plotters and papers)"""
         self._refresh_if_changed()
-        plotters = [self._dict_to_plotter_response(plotter) for plotter in self.config_data['plotters']]
-        papers = [self._dict_to_paper_response(paper) for paper in self.config_data['papers']]
-        default_plotter = self.get_default_plotter()
-        default_paper = self.get_default_paper()
+        # Single pass over each list; the defaults reuse the responses built here
+        plotters, default_plotters = [], []
+        for plotter in self.config_data['plotters']:
+            plotters.append(self._dict_to_plotter_response(plotter))
+            if plotter.get('is_default', False):
+                default_plotters.append(plotter)
+        papers, default_paper = [], None
+        for paper in self.config_data['papers']:
+            response = self._dict_to_paper_response(paper)
+            papers.append(response)
+            if default_paper is None and paper.get('is_default', False):
+                default_paper = response
+        
+        latest_default = self._latest_default_plotter(default_plotters)
+        default_plotter = self._dict_to_plotter_response(latest_default) if latest_default is not None else None
         
         return ConfigurationResponse(
             plotters=plotters,
             papers=papers,
             default_plotter=default_plotter,
             default_paper=default_paper,
-            gcode=self.get_gcode_settings()
+            gcode=default_plotter.gcode_sequences if default_plotter else self.get_gcode_settings()
         )
     
+    def _clear_response_caches(self):
+        """Drop cached responses after config_data changed"""
+        self._plotter_resp_cache.clear()
+        self._paper_resp_cache.clear()
+        self._default_plotter_resp = None
+    
     def _dict_to_plotter_response(self, plotter_dict: Dict[str, Any]) -> PlotterResponse:
+        """Convert dictionary to PlotterResponse, reusing the response built last time"""
+        cached = self._plotter_resp_cache.get(plotter_dict['id'])
+        if cached is not None and cached[0] == plotter_dict['updated_at']:
+            return cached[1]
+        response = self._build_plotter_response(plotter_dict)
+        self._plotter_resp_cache[plotter_dict['id']] = (plotter_dict['updated_at'], response)
+        return response
+    
+    def _build_plotter_response(self, plotter_dict: Dict[str, Any]) -> PlotterResponse:
         """Convert dictionary to PlotterResponse"""
-        gcode_data = plotter_dict.get('gcode_sequences', self._get_default_gcode_sequences())
+        gcode_data = plotter_dict.get('gcode_sequences', DEFAULT_GCODE_SEQUENCES)
         return PlotterResponse(
             id=plotter_dict['id'],
             name=plotter_dict['name'],
@@ -748,11 +864,20 @@ class ConfigurationService:
             home_position_x=plotter_dict['home_position_x'],
             home_position_y=plotter_dict['home_position_y'],
             is_default=plotter_dict['is_default'],
-            created_at=datetime.fromisoformat(plotter_dict['created_at']),
-            updated_at=datetime.fromisoformat(plotter_dict['updated_at'])
+            created_at=_parse_timestamp(plotter_dict['created_at']),
+            updated_at=_parse_timestamp(plotter_dict['updated_at'])
         )
     
     def _dict_to_paper_response(self, paper_dict: Dict[str, Any]) -> PaperResponse:
+        """Convert dictionary to PaperResponse, reusing the response built last time"""
+        cached = self._paper_resp_cache.get(paper_dict['id'])
+        if cached is not None and cached[0] == paper_dict['updated_at']:
+            return cached[1]
+        response = self._build_paper_response(paper_dict)
+        self._paper_resp_cache[paper_dict['id']] = (paper_dict['updated_at'], response)
+        return response
+    
+    def _build_paper_response(self, paper_dict: Dict[str, Any]) -> PaperResponse:
         """Convert dictionary to PaperResponse"""
         return PaperResponse(
             id=paper_dict['id'],
@@ -762,72 +887,80 @@ class ConfigurationService:
             height=paper_dict['height'],
             color=paper_dict['color'],
             is_default=paper_dict['is_default'],
-            created_at=datetime.fromisoformat(paper_dict['created_at']),
-            updated_at=datetime.fromisoformat(paper_dict['updated_at'])
+            created_at=_parse_timestamp(paper_dict['created_at']),
+            updated_at=_parse_timestamp(paper_dict['updated_at'])
         )
 
 
     def get_plotter_gcode_settings(self, plotter_id: str) -> Optional[GcodeSettings]:
         """Return automatic G-code sequences for a specific plotter"""
         self._refresh_if_changed()
-        for plotter in self.config_data.get('plotters', []):
-            if plotter['id'] == plotter_id:
-                gcode_data = plotter.get('gcode_sequences', self._get_default_gcode_sequences())
-                pen_up = gcode_data.get('pen_up_command')
-                if pen_up is None:
-                    pen_up = "M280 P0 S110"
-                pen_down = gcode_data.get('pen_down_command')
-                if pen_down is None:
-                    pen_down = "M280 P0 S130"
-                return GcodeSettings(
-                    on_connect=gcode_data.get('on_connect', []),
-                    before_print=gcode_data.get('before_print', []),
-                    pen_up_command=pen_up,
-                    pen_down_command=pen_down,
-                    servo_delay_ms=gcode_data.get('servo_delay_ms', 100.0),
-                )
-        return None
+        plotter = self._find_plotter(plotter_id)
+        if plotter is None:
+            return None
+        gcode_data = plotter.get('gcode_sequences', DEFAULT_GCODE_SEQUENCES)
+        pen_up = gcode_data.get('pen_up_command')
+        if pen_up is None:
+            pen_up = "M280 P0 S110"
+        pen_down = gcode_data.get('pen_down_command')
+        if pen_down is None:
+            pen_down = "M280 P0 S130"
+        return GcodeSettings(
+            on_connect=gcode_data.get('on_connect', []),
+            before_print=gcode_data.get('before_print', []),
+            pen_up_command=pen_up,
+            pen_down_command=pen_down,
+            servo_delay_ms=gcode_data.get('servo_delay_ms', 100.0),
+        )
 
     def update_plotter_gcode_settings(self, plotter_id: str, gcode_data: GcodeSettingsUpdate) -> Optional[GcodeSettings]:
         """Update automatic G-code sequences for a specific plotter"""
-        for plotter in self.config_data.get('plotters', []):
-            if plotter['id'] == plotter_id:
-                existing = plotter.get('gcode_sequences', self._get_default_gcode_sequences())
-                update_payload = gcode_data.dict(exclude_unset=True)
-
-                if 'on_connect' in update_payload:
-                    if update_payload['on_connect'] is not None:
-                        existing['on_connect'] = update_payload['on_connect']
-                if 'before_print' in update_payload:
-                    if update_payload['before_print'] is not None:
-                        existing['before_print'] = update_payload['before_print']
-                if 'pen_up_command' in update_payload:
-                    if update_payload['pen_up_command'] is not None:
-                        existing['pen_up_command'] = update_payload['pen_up_command']
-                if 'pen_down_command' in update_payload:
-                    if update_payload['pen_down_command'] is not None:
-                        existing['pen_down_command'] = update_payload['pen_down_command']
-                if 'servo_delay_ms' in update_payload:
-                    if update_payload['servo_delay_ms'] is not None:
-                        existing['servo_delay_ms'] = update_payload['servo_delay_ms']
-
-                plotter['gcode_sequences'] = existing
-                self._save_configurations()
-                return self.get_plotter_gcode_settings(plotter_id)
-        return None
+        plotter = self._find_plotter(plotter_id)
+        if plotter is None:
+            return None
+        
+        existing = plotter.get('gcode_sequences', self._get_default_gcode_sequences())
+        update_payload = gcode_data.dict(exclude_unset=True)
+
+        if 'on_connect' in update_payload:
+            if update_payload['on_connect'] is not None:
+                existing['on_connect'] = update_payload['on_connect']
+        if 'before_print' in update_payload:
+            if update_payload['before_print'] is not None:
+                existing['before_print'] = update_payload['before_print']
+        if 'pen_up_command' in update_payload:
+            if update_payload['pen_up_command'] is not None:
+                existing['pen_up_command'] = update_payload['pen_up_command']
+        if 'pen_down_command' in update_payload:
+            if update_payload['pen_down_command'] is not None:
+                existing['pen_down_command'] = update_payload['pen_down_command']
+        if 'servo_delay_ms' in update_payload:
+            if update_payload['servo_delay_ms'] is not None:
+                existing['servo_delay_ms'] = update_payload['servo_delay_ms']
+
+        plotter['gcode_sequences'] = existing
+        self._mark_dirty()
+        return self.get_plotter_gcode_settings(plotter_id)
 
     def rebuild_default_config(self):
         """Force rebuild the configuration with all default values"""
         try:
+            # Write out pending changes so the backup is current
+            self._flush()
+            
             # Create backup of existing config if it exists
             if self.config_file_path.exists():
                 backup_path = self.config_file_path.with_suffix('.yaml.backup')
-                import shutil
                 shutil.copy2(self.config_file_path, backup_path)
             
             # Rebuild with defaults
             self.config_data = self._get_default_config()
-            self._save_configurations()
+            self._rebuild_indexes()
+            with self._write_lock:
+                with self._save_lock:
+                    self._pending_save = None
+                    self._dirty = False
+                self._save_configurations()
             
             return True
         except Exception as e:
@@ -4,11 +4,14 @@ G-code analysis utilities.
 Reads a G-code file and derives basic statistics such as XY extents,
 estimated drawing time, and total travel distances.
 """
+import copy
 import logging
 import math
 import re
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from .config_service import config_service
 
@@ -17,10 +20,29 @@ logger = logging.getLogger(__name__)
 _DRAW_CMDS = {"G1", "G01"}
 _TRAVEL_CMDS = {"G0", "G00"}
 
+# Compiled once; these run several times per G-code line
+_RE_X = re.compile(r"X(-?\d+(?:\.\d+)?)", re.IGNORECASE)
+_RE_Y = re.compile(r"Y(-?\d+(?:\.\d+)?)", re.IGNORECASE)
+_RE_F = re.compile(r"F(-?\d+(?:\.\d+)?)", re.IGNORECASE)
+_RE_DISTANCE_MODE = re.compile(r"\bG9([01])\b", re.IGNORECASE)
+_RE_MOVE_CMD = re.compile(r"\bG0?[01]\b", re.IGNORECASE)
 
-def _extract_float(prefix: str, text: str) -> Optional[float]:
-    """Extract a float that immediately follows the given prefix (e.g., X, Y, F)."""
-    match = re.search(rf"{prefix}(-?\d+(?:\.\d+)?)", text, re.IGNORECASE)
+# Results of recent analyses, keyed by file identity and the feed rates assumed
+ANALYSIS_CACHE_SIZE = 32
+_analysis_cache: "OrderedDict[Tuple[Any, ...], Dict[str, Any]]" = OrderedDict()
+_analysis_cache_lock = threading.Lock()
+
+# G word numbers recognized by the single-pass line parser
+_MOVE_NUMBERS = {"0", "00", "1", "01"}
+_DISTANCE_MODE_NUMBERS = {"90": True, "91": False}
+
+# (move command, X, Y, F, absolute mode change) of one G-code line
+LineFields = Tuple[Optional[str], Optional[float], Optional[float], Optional[float], Optional[bool]]
+
+
+def _extract_float(pattern: re.Pattern, text: str) -> Optional[float]:
+    """Extract the float captured by a compiled pattern such as _RE_X."""
+    match = pattern.search(text)
     if not match:
         return None
     try:
@@ -29,16 +51,59 @@ def _extract_float(prefix: str, text: str) -> Optional[float]:
         return None
 
 
-def _update_bounds(bounds: Optional[Dict[str, float]], x: float, y: float) -> Dict[str, float]:
-    """Expand the bounding box to include the provided point."""
-    if bounds is None:
-        return {"minX": x, "maxX": x, "minY": y, "maxY": y}
-    return {
-        "minX": min(bounds["minX"], x),
-        "maxX": max(bounds["maxX"], x),
-        "minY": min(bounds["minY"], y),
-        "maxY": max(bounds["maxY"], y),
-    }
+def _parse_line_regex(clean: str) -> LineFields:
+    """Regex fallback for _parse_line, used on lines that are not plain words."""
+    mode_match = _RE_DISTANCE_MODE.search(clean)
+    absolute_mode = mode_match.group(1) == "0" if mode_match else None
+    cmd_match = _RE_MOVE_CMD.search(clean)
+    if not cmd_match:
+        return None, None, None, None, absolute_mode
+    return (
+        cmd_match.group(0).upper(),
+        _extract_float(_RE_X, clean),
+        _extract_float(_RE_Y, clean),
+        _extract_float(_RE_F, clean),
+        absolute_mode,
+    )
+
+
+def _parse_line(clean: str) -> LineFields:
+    """
+    Split a comment-free G-code line into (move command, X, Y, F, absolute mode).
+
+    Lines made of plain words (a letter followed by a number, e.g. ``G1 X10.5 Y-2``)
+    are parsed in a single pass over their words; anything else goes through the
+    regex patterns, which yield the same fields for plain lines.
+    """
+    cmd = x = y = f = absolute_mode = None
+    for word in clean.split():
+        # Each word must be a letter and exactly what the value patterns
+        # capture, -?digits[.digits]; otherwise the regexes decide
+        number = word[1:]
+        body = number[1:] if number[:1] == "-" else number
+        whole, dot, frac = body.partition(".")
+        if not whole.isdecimal() or (dot and not frac.isdecimal()):
+            return _parse_line_regex(clean)
+        letter = word[0]
+        if letter in "Gg":
+            if dot or number[:1] == "-":
+                return _parse_line_regex(clean)
+            if cmd is None and number in _MOVE_NUMBERS:
+                cmd = "G" + number
+            elif absolute_mode is None and number in _DISTANCE_MODE_NUMBERS:
+                absolute_mode = _DISTANCE_MODE_NUMBERS[number]
+        elif letter in "Xx":
+            if x is None:
+                x = float(number)
+        elif letter in "Yy":
+            if y is None:
+                y = float(number)
+        elif letter in "Ff":
+            if f is None:
+                f = float(number)
+    if cmd is None:
+        return None, None, None, None, absolute_mode
+    return cmd, x, y, f, absolute_mode
 
 
 def analyze_gcode_file(
@@ -60,7 +125,8 @@ def analyze_gcode_file(
     path = Path(file_path)
     if not path.exists() or not path.is_file():
         raise FileNotFoundError(f"G-code file not found: {path}")
-    if path.stat().st_size == 0:
+    file_stat = path.stat()
+    if file_stat.st_size == 0:
         raise ValueError("G-code file is empty")
 
     # Seed feed rates from the default plotter configuration when available.
@@ -75,6 +141,31 @@ def analyze_gcode_file(
     default_draw_feed = default_draw_feed or 1200.0  # reasonable pen speed (~20 mm/s)
     default_travel_feed = default_travel_feed or 6000.0  # faster travel (~100 mm/s)
 
+    # Re-analyzing an unchanged file (preview, confirm, queue, ...) reuses the result
+    cache_key = (
+        str(path.resolve()),
+        file_stat.st_mtime_ns,
+        file_stat.st_size,
+        default_draw_feed,
+        default_travel_feed,
+    )
+    with _analysis_cache_lock:
+        cached = _analysis_cache.get(cache_key)
+        if cached is not None:
+            _analysis_cache.move_to_end(cache_key)
+            return copy.deepcopy(cached)
+
+    result = _scan_gcode(path, default_draw_feed, default_travel_feed)
+
+    with _analysis_cache_lock:
+        _analysis_cache[cache_key] = result
+        if len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+            _analysis_cache.popitem(last=False)
+    return copy.deepcopy(result)
+
+
+def _scan_gcode(path: Path, default_draw_feed: float, default_travel_feed: float) -> Dict[str, Any]:
+    """Walk the G-code file once and compute the statistics returned by analyze_gcode_file."""
     current_draw_feed = default_draw_feed
     current_travel_feed = default_travel_feed
 
@@ -86,7 +177,7 @@ def analyze_gcode_file(
     pen_distance = 0.0
     travel_distance = 0.0
     estimated_time_seconds = 0.0
-    bounds: Optional[Dict[str, float]] = None
+    min_x = max_x = min_y = max_y = None
     absolute_mode = True
     x = 0.0
     y = 0.0
@@ -96,6 +187,11 @@ def analyze_gcode_file(
     feed_sum = 0.0
     feed_samples = 0
 
+    # Local names skip the global and attribute lookups on every move
+    hypot = math.hypot
+    isclose = math.isclose
+    draw_cmds = _DRAW_CMDS
+
     with open(path, "r", encoding="utf-8", errors="ignore") as handle:
         for raw_line in handle:
             lines_processed += 1
@@ -103,20 +199,14 @@ def analyze_gcode_file(
             if not clean:
                 continue
 
-            if re.search(r"\bG90\b", clean, re.IGNORECASE):
-                absolute_mode = True
-            elif re.search(r"\bG91\b", clean, re.IGNORECASE):
-                absolute_mode = False
-
-            cmd_match = re.search(r"\bG0?0\b|\bG0?1\b", clean, re.IGNORECASE)
-            if not cmd_match:
+            cmd, next_x_val, next_y_val, f_value, mode_change = _parse_line(clean)
+            if mode_change is not None:
+                absolute_mode = mode_change
+            if cmd is None:
                 continue
 
-            cmd = cmd_match.group(0).upper()
-
-            f_value = _extract_float("F", clean)
             if f_value and f_value > 0:
-                if cmd in _DRAW_CMDS:
+                if cmd in draw_cmds:
                     current_draw_feed = f_value
                 else:
                     current_travel_feed = f_value
@@ -125,9 +215,6 @@ def analyze_gcode_file(
                 feed_sum += f_value
                 feed_samples += 1
 
-            next_x_val = _extract_float("X", clean)
-            next_y_val = _extract_float("Y", clean)
-
             if absolute_mode:
                 next_x = x if next_x_val is None else next_x_val
                 next_y = y if next_y_val is None else next_y_val
@@ -135,17 +222,28 @@ def analyze_gcode_file(
                 next_x = x + (next_x_val or 0.0)
                 next_y = y + (next_y_val or 0.0)
 
-            if math.isclose(next_x, x) and math.isclose(next_y, y):
+            if isclose(next_x, x) and isclose(next_y, y):
                 continue
 
-            bounds = _update_bounds(bounds, x, y)
-            bounds = _update_bounds(bounds, next_x, next_y)
-
-            distance = math.hypot(next_x - x, next_y - y)
+            # The start point only needs seeding once: every later move starts
+            # where an earlier accepted move ended
+            if min_x is None:
+                min_x = max_x = x
+                min_y = max_y = y
+            if next_x < min_x:
+                min_x = next_x
+            elif next_x > max_x:
+                max_x = next_x
+            if next_y < min_y:
+                min_y = next_y
+            elif next_y > max_y:
+                max_y = next_y
+
+            distance = hypot(next_x - x, next_y - y)
             total_distance += distance
             move_commands += 1
 
-            pen_down = cmd in _DRAW_CMDS
+            pen_down = cmd in draw_cmds
             if pen_down:
                 pen_moves += 1
                 pen_distance += distance
@@ -160,10 +258,11 @@ def analyze_gcode_file(
 
             x, y = next_x, next_y
 
-    width = height = None
-    if bounds:
-        width = bounds["maxX"] - bounds["minX"]
-        height = bounds["maxY"] - bounds["minY"]
+    bounds = width = height = None
+    if min_x is not None:
+        bounds = {"minX": min_x, "maxX": max_x, "minY": min_y, "maxY": max_y}
+        width = max_x - min_x
+        height = max_y - min_y
 
     avg_feed = feed_sum / feed_samples if feed_samples else None
 
@@ -7,20 +7,59 @@ import os
 import re
 import json
 import logging
-from typing import List, Tuple, Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from fastapi import HTTPException
 from pathlib import Path
 
-from .config import config
+from .config import get_config
 
 logger = logging.getLogger(__name__)
 
+
+def _floyd_steinberg_kernel(img: np.ndarray) -> np.ndarray:
+    """Dither a C-contiguous float32 grayscale image in place; returns the 0/255 uint8 result"""
+    height, width = img.shape
+    out = np.empty((height, width), dtype=np.uint8)
+    
+    for y in range(height):
+        for x in range(width):
+            old_pixel = img[y, x]
+            new_pixel = 255.0 if old_pixel > 127 else 0.0
+            out[y, x] = 255 if old_pixel > 127 else 0
+            
+            error = old_pixel - new_pixel
+            
+            if x + 1 < width:
+                img[y, x + 1] += error * (7.0 / 16.0)
+            if y + 1 < height:
+                if x - 1 >= 0:
+                    img[y + 1, x - 1] += error * (3.0 / 16.0)
+                img[y + 1, x] += error * (5.0 / 16.0)
+                if x + 1 < width:
+                    img[y + 1, x + 1] += error * (1.0 / 16.0)
+    
+    return out
+
+
+# Numba is optional; without it dithering uses Pillow's C implementation
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    # Compiled lazily on the first dither call; cache=True keeps the machine
+    # code on disk, so later processes load it instead of recompiling
+    _floyd_steinberg_kernel = njit(cache=True, fastmath=True, boundscheck=False)(_floyd_steinberg_kernel)
+
+
 class ImageHelper:
     """Helper class for image processing and file management"""
     
     def __init__(self):
         """Initialize ImageHelper with configuration from config system"""
+        config = get_config()
         self.project_storage_path = Path(config.project_storage)
         self.max_file_size = config.max_file_size
         self.allowed_image_types = config.allowed_image_types
@@ -151,25 +190,27 @@ class ImageHelper:
             else:
                 target_size = tuple(self.resolution_presets["medium"])
             
-            image = image.resize(target_size, Image.Resampling.LANCZOS)
+            # Resize as an array; OpenCV's area interpolation is much faster
+            # than Pillow's LANCZOS for the usual downscale
+            img_array = cv2.resize(np.asarray(image), target_size, interpolation=cv2.INTER_AREA)
             
-            # Convert to numpy array for OpenCV processing
-            img_array = np.array(image)
-            
-            # Apply threshold using config defaults
-            threshold = settings.get("threshold", self.default_threshold)
-            _, binary = cv2.threshold(img_array, threshold, 255, cv2.THRESH_BINARY)
+            # Dither if requested, otherwise threshold, using config defaults
+            if settings.get("dither", self.default_dither):
+                binary = self._apply_floyd_steinberg_dithering(img_array)
+            else:
+                threshold = settings.get("threshold", self.default_threshold)
+                _, binary = cv2.threshold(img_array, threshold, 255, cv2.THRESH_BINARY)
             
             # Invert if requested using config defaults
             if settings.get("invert", self.default_invert):
                 binary = cv2.bitwise_not(binary)
             
-            # Apply dithering if requested using config defaults
-            if settings.get("dither", self.default_dither):
-                binary = self._apply_floyd_steinberg_dithering(img_array)
-            
-            # Convert back to PIL Image
-            processed_image = Image.fromarray(binary)
+            # Encode the PNG once with OpenCV, straight from the array; the same
+            # bytes are written to disk and used for the preview
+            encoded_ok, encoded = cv2.imencode('.png', binary)
+            if not encoded_ok:
+                raise ValueError("Failed to encode processed image")
+            png_bytes = encoded.tobytes()
             
             # Save processed image to project directory if provided
             output_path = None
@@ -182,28 +223,26 @@ class ImageHelper:
                 output_path = project_dir / processed_filename
                 
                 try:
-                    processed_image.save(output_path)
+                    output_path.write_bytes(png_bytes)
                     logger.info(f"Successfully saved processed image to {output_path}")
                     output_path = str(output_path)
                 except Exception as e:
                     logger.error(f"Failed to save processed image to {output_path}: {e}")
                     # Fallback to temporary location
                     output_path = f"temp_processed_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-                    processed_image.save(output_path)
+                    Path(output_path).write_bytes(png_bytes)
             else:
                 # Fallback to temporary location if no project provided
                 output_path = f"temp_processed_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-                processed_image.save(output_path)
+                Path(output_path).write_bytes(png_bytes)
             
             # Convert to base64 for preview
-            buffer = io.BytesIO()
-            processed_image.save(buffer, format='PNG')
-            img_base64 = base64.b64encode(buffer.getvalue()).decode()
+            img_base64 = base64.b64encode(png_bytes).decode()
             
             return {
                 "success": True,
                 "original_size": image.size,
-                "processed_size": processed_image.size,
+                "processed_size": (binary.shape[1], binary.shape[0]),
                 "output_path": output_path,
                 "preview": f"data:image/png;base64,{img_base64}",
                 "plotting_data": self._convert_to_plotting_data(binary)
@@ -215,42 +254,22 @@ class ImageHelper:
     
     def _apply_floyd_steinberg_dithering(self, image: np.ndarray) -> np.ndarray:
         """Apply Floyd-Steinberg dithering to image"""
-        img = image.astype(float)
-        height, width = img.shape
-        
-        for y in range(height):
-            for x in range(width):
-                old_pixel = img[y, x]
-                new_pixel = 255 if old_pixel > 127 else 0
-                img[y, x] = new_pixel
-                
-                error = old_pixel - new_pixel
-                
-                if x + 1 < width:
-                    img[y, x + 1] += error * 7 / 16
-                if x - 1 >= 0 and y + 1 < height:
-                    img[y + 1, x - 1] += error * 3 / 16
-                if y + 1 < height:
-                    img[y + 1, x] += error * 5 / 16
-                if x + 1 < width and y + 1 < height:
-                    img[y + 1, x + 1] += error * 1 / 16
-        
-        return img.astype(np.uint8)
+        if njit is None:
+            # Pillow's error diffusion runs in C; the pure-Python kernel is far too slow
+            dithered = Image.fromarray(image).convert('1', dither=Image.Dither.FLOYDSTEINBERG)
+            return np.asarray(dithered, dtype=np.uint8) * 255
+        # astype copies into a fresh C-contiguous buffer the kernel can diffuse error into
+        return _floyd_steinberg_kernel(image.astype(np.float32, order='C'))
     
-    def _convert_to_plotting_data(self, binary_image: np.ndarray) -> List[Tuple[float, float]]:
+    def _convert_to_plotting_data(self, binary_image: np.ndarray) -> List[List[float]]:
         """Convert binary image to plotting coordinates"""
         height, width = binary_image.shape
-        plotting_points = []
         
-        for y in range(height):
-            for x in range(width):
-                if binary_image[y, x] == 0:  # Black pixel
-                    # Convert to plotter coordinates
-                    plot_x = (x / width) * 100  # Scale to 0-100
-                    plot_y = (y / height) * 100
-                    plotting_points.append((plot_x, plot_y))
+        # Black pixels, in row-major order
+        ys, xs = np.nonzero(binary_image == 0)
         
-        return plotting_points
+        # Convert to plotter coordinates, scaled to 0-100, as [x, y] pairs
+        return np.column_stack(((xs / width) * 100, (ys / height) * 100)).tolist()
     
     
     def process_upload(self, file_content: bytes, file_content_type: str, file_size: int, 
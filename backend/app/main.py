@@ -17,7 +17,7 @@ from pathlib import Path
 import re
 from concurrent.futures import ThreadPoolExecutor
 from .image_processor import ImageHelper
-from .config import Config, Settings
+from .config import Config, Settings, get_config
 from .project_models import ProjectCreate, ProjectResponse, ProjectListResponse, FileRenameRequest
 from .project_service import project_service
 from .vectorizer import PolargraphVectorizer, VectorizationSettings
@@ -42,6 +42,13 @@ from .plotter_service import plotter_service, GCODE_SEND_DELAY_SECONDS
 from .gcode_analyzer import analyze_gcode_file
 from .svg_analyzer import analyze_svg_file
 
+# Configuration responses are encoded with orjson when it is installed
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as ConfigJSONResponse
+except ImportError:
+    ConfigJSONResponse = JSONResponse
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -71,7 +78,7 @@ def cleanup_tmp_directory(max_age_hours: int = 24) -> Dict[str, Any]:
     """
     try:
         # Get tmp directory path - handle both relative and absolute paths
-        local_storage = config.local_storage
+        local_storage = get_config().local_storage
         if local_storage.startswith('/'):
             # Absolute path (Docker/container)
             tmp_dir = Path(local_storage) / "tmp"
@@ -163,6 +170,8 @@ async def lifespan(app: FastAPI):
     # Shutdown thread pool executor
     vectorization_executor.shutdown(wait=True)
     logger.info("Thread pool executor shut down")
+    # Write out configuration changes still waiting to be saved
+    config_service.close()
 
 app = FastAPI(
     title="PolarVortex API",
@@ -2150,7 +2159,7 @@ async def cleanup_tmp_endpoint(max_age_hours: int = 24):
 
 
 # Configuration Endpoints
-@app.get("/config", response_model=ConfigurationResponse)
+@app.get("/config", response_model=ConfigurationResponse, response_class=ConfigJSONResponse)
 async def get_all_configurations():
     """Get all configuration settings (plotters and papers)"""
     try:
@@ -2160,7 +2169,7 @@ async def get_all_configurations():
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/config/gcode", response_model=GcodeSettings)
+@app.get("/config/gcode", response_model=GcodeSettings, response_class=ConfigJSONResponse)
 async def get_gcode_settings():
     """Get automatic G-code sequences"""
     try:
@@ -2209,7 +2218,7 @@ async def create_plotter(plotter_data: PlotterCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/config/plotters", response_model=PlotterListResponse)
+@app.get("/config/plotters", response_model=PlotterListResponse, response_class=ConfigJSONResponse)
 async def list_plotters():
     """List all plotter configurations"""
     try:
@@ -2219,7 +2228,7 @@ async def list_plotters():
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/config/plotters/default", response_model=PlotterResponse)
+@app.get("/config/plotters/default", response_model=PlotterResponse, response_class=ConfigJSONResponse)
 async def get_default_plotter():
     """Get the default plotter configuration"""
     try:
@@ -2234,7 +2243,7 @@ async def get_default_plotter():
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/config/plotters/{plotter_id}", response_model=PlotterResponse)
+@app.get("/config/plotters/{plotter_id}", response_model=PlotterResponse, response_class=ConfigJSONResponse)
 async def get_plotter(plotter_id: str):
     """Get a plotter configuration by ID"""
     try:
@@ -2314,7 +2323,7 @@ async def create_paper(paper_data: PaperCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/config/papers", response_model=PaperListResponse)
+@app.get("/config/papers", response_model=PaperListResponse, response_class=ConfigJSONResponse)
 async def list_papers():
     """List all paper configurations"""
     try:
@@ -2324,7 +2333,7 @@ async def list_papers():
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/config/papers/{paper_id}", response_model=PaperResponse)
+@app.get("/config/papers/{paper_id}", response_model=PaperResponse, response_class=ConfigJSONResponse)
 async def get_paper(paper_id: str):
     """Get a paper configuration by ID"""
     try:
@@ -2384,7 +2393,7 @@ async def delete_paper(paper_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/config/papers/default", response_model=PaperResponse)
+@app.get("/config/papers/default", response_model=PaperResponse, response_class=ConfigJSONResponse)
 async def get_default_paper():
     """Get the default paper configuration"""
     try:
@@ -7,7 +7,7 @@ from datetime import datetime
 import logging
 
 from .project_models import Project, ProjectCreate, ProjectResponse, VectorizationInfo
-from .config import config
+from .config import get_config
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +17,7 @@ class ProjectService:
     
     def __init__(self):
         """Initialize the project service"""
-        self.project_storage_path = Path(config.project_storage)
+        self.project_storage_path = Path(get_config().project_storage)
         self._ensure_project_storage_exists()
     
     def _ensure_project_storage_exists(self):
@@ -1,6 +1,6 @@
 import cv2
 import numpy as np
-from PIL import Image, ImageFilter
+from PIL import Image
 import io
 import base64
 import json
@@ -190,7 +190,10 @@ class PolargraphVectorizer:
         # Apply blur for noise reduction
         # blur_radius: Controls smoothing strength (0=no blur, higher=more smoothing)
         if self.settings.enable_noise_reduction and self.settings.blur_radius > 0:
-            image = image.filter(ImageFilter.GaussianBlur(radius=self.settings.blur_radius))
+            # OpenCV's separable Gaussian is much faster than Pillow's filter;
+            # Pillow's radius is the standard deviation, which maps to sigmaX
+            blurred = cv2.GaussianBlur(np.asarray(image), (0, 0), sigmaX=self.settings.blur_radius)
+            image = Image.fromarray(blurred)
         
         # Apply posterization to reduce color complexity
         # posterize_levels: Reduces colors to N levels (2-256, lower=simpler, higher=more colors)
@@ -305,19 +308,16 @@ class PolargraphVectorizer:
     def _contour_to_path(self, contour: np.ndarray, color: Tuple[int, int, int], area: float) -> Optional[VectorPath]:
         """Convert OpenCV contour to VectorPath"""
         try:
-            # Extract points from contour
-            points = []
-            for point in contour:
-                x, y = point[0]
-                points.append((float(x), float(y)))
-            
-            if len(points) < self.settings.min_contour_points:
+            # OpenCV contours are (N, 1, 2) arrays; flatten them in one step
+            coords = contour.reshape(-1, 2)
+            if len(coords) < self.settings.min_contour_points:
                 return None
+            points = list(map(tuple, coords.astype(float).tolist()))
             
             # Calculate bounding box
-            x_coords = [p[0] for p in points]
-            y_coords = [p[1] for p in points]
-            bbox = (min(x_coords), min(y_coords), max(x_coords), max(y_coords))
+            x_min, y_min = coords.min(axis=0).tolist()
+            x_max, y_max = coords.max(axis=0).tolist()
+            bbox = (float(x_min), float(y_min), float(x_max), float(y_max))
             
             # Ensure path is closed
             if points[0] != points[-1]:
@@ -100,23 +100,20 @@ class SimpleThresholdVectorizer(BaseVectorizer):
                 if area < min_area:
                     continue
                 
-                # Extract points
-                points = []
-                for point in contour:
-                    x, y = point[0]
-                    points.append((float(x), float(y)))
-                
-                if len(points) < 3:
+                # Extract points from the (N, 1, 2) contour array in one step
+                coords = contour.reshape(-1, 2)
+                if len(coords) < 3:
                     continue
+                points = list(map(tuple, coords.astype(float).tolist()))
                 
                 # Close the path
                 if points[0] != points[-1]:
                     points.append(points[0])
                 
                 # Calculate bounding box
-                x_coords = [p[0] for p in points]
-                y_coords = [p[1] for p in points]
-                bbox = (min(x_coords), min(y_coords), max(x_coords), max(y_coords))
+                x_min, y_min = coords.min(axis=0).tolist()
+                x_max, y_max = coords.max(axis=0).tolist()
+                bbox = (float(x_min), float(y_min), float(x_max), float(y_max))
                 
                 # Create path (black color for threshold)
                 path = VectorPath(
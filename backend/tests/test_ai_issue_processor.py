@@ -0,0 +1,89 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / ".github" / "scripts"))
+
+from ai_issue_processor import (  # noqa: E402
+    ResponseFormatError,
+    parse_delimited_response,
+    parse_json_response,
+)
+
+
+def test_delimited_response_with_surrounding_text():
+    content = (
+        "Here are the changes you asked for.\n"
+        "===== FILE: backend/app/a.py =====\n"
+        "print('a')\n"
+        "===== END FILE: backend/app/a.py =====\n"
+        "Some chatter between files.\n"
+        "===== FILE: README.md =====\n"
+        "# Title\n"
+        "\n"
+        "===== END FILE: README.md =====\n"
+        "===== SUMMARY =====\n"
+        "Changed two files.\n"
+        "===== NOTES =====\n"
+        "Nothing else.\n"
+    )
+    result = parse_delimited_response(content)
+    assert result["files"] == {
+        "backend/app/a.py": "print('a')\n",
+        "README.md": "# Title\n",
+    }
+    assert result["summary"] == "Changed two files."
+    assert result["notes"] == "Nothing else."
+
+
+def test_delimited_response_missing_end_marker():
+    content = (
+        "===== FILE: a.py =====\n"
+        "print('a')\n"
+        "===== END FILE: a.py =====\n"
+        "===== FILE: b.py =====\n"
+        "print('b')\n"
+    )
+    with pytest.raises(ResponseFormatError, match="Unterminated"):
+        parse_delimited_response(content)
+
+
+def test_delimited_response_mismatched_end_marker():
+    content = (
+        "===== FILE: a.py =====\n"
+        "print('a')\n"
+        "===== END FILE: b.py =====\n"
+    )
+    with pytest.raises(ResponseFormatError, match="Unterminated"):
+        parse_delimited_response(content)
+
+
+def test_delimited_response_without_sections():
+    with pytest.raises(ResponseFormatError, match="No file sections"):
+        parse_delimited_response('{"files": {"a.py": "print(1)"}}')
+
+
+def test_json_response_with_trailing_text():
+    content = '{"summary": "done {not a brace}", "files": {"a.py": "x = {}\\n"}}\nLet me know if you need more.'
+    assert parse_json_response(content) == {
+        "summary": "done {not a brace}",
+        "files": {"a.py": "x = {}\n"},
+    }
+
+
+def test_json_response_with_leading_text_and_fence():
+    content = 'Sure:\n```json\n{"files": {}}\n```\nTrailing } brace.'
+    assert parse_json_response(content) == {"files": {}}
+
+
+def test_json_response_json_mode_falls_back_on_trailing_text():
+    assert parse_json_response('{"a": 1} trailing', json_mode=True) == {"a": 1}
+
+
+def test_json_response_empty_or_invalid():
+    with pytest.raises(json.JSONDecodeError):
+        parse_json_response("")
+    with pytest.raises(json.JSONDecodeError):
+        parse_json_response('{"a": ')
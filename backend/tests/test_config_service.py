@@ -0,0 +1,94 @@
+import time
+
+import pytest
+import yaml
+
+from app import config_service as config_service_module
+from app.config_models import PaperUpdate
+from app.config_service import ConfigurationService
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.fixture()
+def service(tmp_path, monkeypatch):
+    """A fresh service on its own config file, with writes counted."""
+    monkeypatch.setenv("PV_CONFIG", str(tmp_path / "config" / "config.yaml"))
+    svc = ConfigurationService()
+    svc.config_data  # create and load the file before counting writes
+    svc._flush()
+
+    writes = []
+    real_save = svc._save_configurations
+
+    def counting_save(data=None):
+        writes.append(data)
+        return real_save(data)
+
+    monkeypatch.setattr(svc, "_save_configurations", counting_save)
+    svc.writes = writes
+    yield svc
+    svc.close()
+
+
+def _saved_paper_names(svc):
+    with open(svc.config_file_path, encoding="utf-8") as f:
+        return [p["name"] for p in yaml.safe_load(f)["papers"]]
+
+
+def test_mutations_in_quick_succession_are_written_once(service, monkeypatch):
+    monkeypatch.setattr(config_service_module, "SAVE_DELAY_SECONDS", 0.2)
+    paper_id = service.get_default_paper().id
+
+    for name in ("First", "Second", "Third"):
+        service.update_paper(paper_id, PaperUpdate(name=name))
+    assert service.writes == []
+
+    assert _wait_for(lambda: service.writes)
+    time.sleep(0.3)
+    assert len(service.writes) == 1
+    assert "Third" in _saved_paper_names(service)
+
+
+def test_close_flushes_pending_changes(service, monkeypatch):
+    monkeypatch.setattr(config_service_module, "SAVE_DELAY_SECONDS", 60.0)
+    paper_id = service.get_default_paper().id
+
+    service.update_paper(paper_id, PaperUpdate(name="Flushed on close"))
+    assert service.writes == []
+
+    service.close()
+    assert len(service.writes) == 1
+    assert "Flushed on close" in _saved_paper_names(service)
+    assert service._save_timer is None
+
+
+def test_failed_write_is_retried(service, monkeypatch):
+    monkeypatch.setattr(config_service_module, "SAVE_DELAY_SECONDS", 0.01)
+    monkeypatch.setattr(config_service_module, "SAVE_RETRY_SECONDS", 0.05)
+    paper_id = service.get_default_paper().id
+
+    counting_save = service._save_configurations
+    failures = []
+
+    def failing_once(data=None):
+        if not failures:
+            failures.append(data)
+            raise OSError("disk full")
+        return counting_save(data)
+
+    monkeypatch.setattr(service, "_save_configurations", failing_once)
+    service.update_paper(paper_id, PaperUpdate(name="Retried"))
+
+    assert _wait_for(lambda: service.writes)
+    assert len(failures) == 1
+    assert service.writes == failures
+    assert _wait_for(lambda: not service._dirty)
+    assert "Retried" in _saved_paper_names(service)
@@ -0,0 +1,102 @@
+import os
+
+import pytest
+
+from app import gcode_analyzer
+from app.gcode_analyzer import _parse_line, _parse_line_regex
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        # plain words
+        "G1 X10.5 Y-2 F1500",
+        "G0 X0 Y0",
+        "G01 X1 Y2",
+        "G00 Y3.25",
+        "G90",
+        "G91",
+        "G91 G1 X5",
+        "G1 X1 X2 Y3 Y4",
+        # lowercase words
+        "g1 x10 y20 f300",
+        "g0 x-1.5",
+        "g90",
+        # inline comments the ';' split leaves in place
+        "G1 X10 (pen down) Y5",
+        "(only a comment)",
+        "G1 X3 Y4 *57",
+        # signed and exponent numbers
+        "G1 X+5 Y-5",
+        "G1 X1e3 Y2",
+        "G1 X1.5E-2 Y.5",
+        "G1 X-0.0 Y-.5",
+        "G-1 X1",
+        "G1.5 X1",
+        # no words / not move lines
+        "",
+        "%",
+        "M280 P0 S110",
+        "G28",
+        "G4 P100",
+        "G1X10Y20",
+        "X10 Y20",
+        "G1 X Y",
+    ],
+)
+def test_parse_line_matches_regex_path(line):
+    assert _parse_line(line) == _parse_line_regex(line)
+
+
+def _write_gcode(path, text):
+    path.write_text(text, encoding="utf-8")
+
+
+@pytest.fixture()
+def no_default_plotter(monkeypatch):
+    monkeypatch.setattr(gcode_analyzer.config_service, "get_default_plotter", lambda: None)
+    gcode_analyzer._analysis_cache.clear()
+    yield
+    gcode_analyzer._analysis_cache.clear()
+
+
+def test_analysis_cache_reuses_unchanged_file(tmp_path, monkeypatch, no_default_plotter):
+    gcode = tmp_path / "drawing.gcode"
+    _write_gcode(gcode, "G90\nG1 X10 Y0\n")
+
+    scans = []
+    real_scan = gcode_analyzer._scan_gcode
+
+    def counting_scan(*args):
+        scans.append(args)
+        return real_scan(*args)
+
+    monkeypatch.setattr(gcode_analyzer, "_scan_gcode", counting_scan)
+
+    first = gcode_analyzer.analyze_gcode_file(gcode)
+    second = gcode_analyzer.analyze_gcode_file(gcode)
+    assert first == second
+    assert len(scans) == 1
+
+    # Callers get their own copy of the cached result
+    first["bounds"]["maxX"] = -1
+    assert gcode_analyzer.analyze_gcode_file(gcode) == second
+
+
+def test_analysis_cache_invalidated_when_file_changes(tmp_path, no_default_plotter):
+    gcode = tmp_path / "drawing.gcode"
+    _write_gcode(gcode, "G90\nG1 X10 Y0\n")
+    before = gcode_analyzer.analyze_gcode_file(gcode)
+
+    # Different size
+    _write_gcode(gcode, "G90\nG1 X10 Y0\nG1 X10 Y10\n")
+    grown = gcode_analyzer.analyze_gcode_file(gcode)
+    assert grown["move_commands"] == before["move_commands"] + 1
+
+    # Same size, only the modification time tells the files apart
+    stat = gcode.stat()
+    _write_gcode(gcode, "G90\nG1 X20 Y0\nG1 X20 Y20\n")
+    os.utime(gcode, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert gcode.stat().st_size == stat.st_size
+    moved = gcode_analyzer.analyze_gcode_file(gcode)
+    assert moved["bounds"]["maxX"] == 20